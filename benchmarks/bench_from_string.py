@@ -0,0 +1,212 @@
+"""Benchmarks of the from_string phases across generated template shapes.
+
+Each template shape varies one dimension (template size, reference count,
+number of variables, modifier chain depth or range size) from a base
+shape. For each shape and phase, the benchmark reports the operations per
+second and the peak memory allocated (tracemalloc).
+
+Phases:
+    scan: tokenize the template (lexer.tokenize)
+    parse: build the variable table (parser._parse_template)
+    compile: parse and build the CompiledTemplate (segments and structure)
+    render: render every generated json as string (render_string)
+    decode: json.loads of every rendered json string
+    build: render every generated json structurally as python dict
+
+Usage:
+    python benchmarks/bench_from_string.py
+    python benchmarks/bench_from_string.py --save baseline.json
+    python benchmarks/bench_from_string.py --compare baseline.json
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+# pylint: disable=wrong-import-position
+import json_factory
+from json_factory.lexer import tokenize
+from json_factory.parser import _parse_template
+
+MODIFIER_CHAIN = [".zfill(8)", ".to_int()"]
+
+
+@dataclass
+class TemplateShape:
+    """Dimensions of a generated benchmark template."""
+
+    name: str
+    references: int = 50
+    """Number of variable references (besides the declarations)."""
+    variables: int = 2
+    """Number of declared variables."""
+    modifier_depth: int = 1
+    """Number of chained modifiers on each reference."""
+    range_size: int = 200
+    """Number of generated jsons."""
+    padding_bytes: int = 0
+    """Size of the constant padding text added to the template."""
+
+
+SHAPES = [
+    TemplateShape("base"),
+    TemplateShape("large_template", padding_bytes=1_000_000),
+    TemplateShape("many_references", references=2_000),
+    TemplateShape("many_variables", variables=50),
+    TemplateShape("deep_modifiers", modifier_depth=6),
+    TemplateShape("large_range", range_size=5_000),
+]
+
+
+def make_template(shape: TemplateShape) -> str:
+    """Generate the JSON string with custom syntax of a template shape."""
+    fields = [
+        f'"var{v}" : $var{v}(<0-{shape.range_size - 1}>)'
+        for v in range(shape.variables)
+    ]
+
+    modifiers = "".join(
+        MODIFIER_CHAIN[d % len(MODIFIER_CHAIN)] for d in range(shape.modifier_depth)
+    )
+    # Chains ending in zfill are strings, keep them inside of json strings
+    quote = '"' if modifiers.endswith(".zfill(8)") else ""
+    for r in range(shape.references):
+        variable = f"$var{r % shape.variables}{modifiers}"
+        fields.append(f'"ref{r}" : {quote}{variable}{quote}')
+
+    if shape.padding_bytes:
+        chunk = '"padding text without references"'
+        count = shape.padding_bytes // (len(chunk) + 2)
+        fields.append('"padding" : [' + ", ".join([chunk] * count) + "]")
+
+    return "{\n  " + ",\n  ".join(fields) + "\n}"
+
+
+def _measure(
+    function: Callable[[], Any], operations: int, min_time: float
+) -> tuple[float, int]:
+    """Return the operations per second and the peak memory of a function."""
+    tracemalloc.start()
+    function()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    runs = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time or runs < 1:
+        function()
+        runs += 1
+        elapsed = time.perf_counter() - start
+
+    return operations * runs / elapsed, peak_memory
+
+
+def bench_shape(shape: TemplateShape, min_time: float) -> dict[str, dict[str, float]]:
+    """Benchmark every phase of a template shape."""
+    json_string = make_template(shape)
+    template = json_factory.compile(json_string, use_cache=False)
+    structural = json_factory.compile(json_string, structural=True, use_cache=False)
+    strings = [template.render_string(i) for i in range(len(template))]
+    range_size = len(template)
+
+    phases: dict[str, tuple[Callable[[], Any], int]] = {
+        "scan": (lambda: tokenize(json_string), 1),
+        "parse": (lambda: _parse_template(json_string), 1),
+        "compile": (lambda: json_factory.compile(json_string, use_cache=False), 1),
+        "render": (
+            lambda: [template.render_string(i) for i in range(range_size)],
+            range_size,
+        ),
+        "decode": (lambda: [json.loads(string) for string in strings], range_size),
+        "build": (lambda: structural.render_all(), range_size),
+    }
+
+    results = {}
+    for phase, (function, operations) in phases.items():
+        ops_per_sec, peak_memory = _measure(function, operations, min_time)
+        results[phase] = {"ops_per_sec": ops_per_sec, "peak_memory": peak_memory}
+    return results
+
+
+def compare(
+    results: dict[str, Any], baseline: dict[str, Any], threshold: float
+) -> list[str]:
+    """Return the regressions of the results against the baseline, a
+    slowdown or memory growth larger than the threshold ratio."""
+    regressions = []
+    for shape, phases in results.items():
+        for phase, result in phases.items():
+            base = baseline.get(shape, {}).get(phase)
+            if not base:
+                continue
+            speed = result["ops_per_sec"] / base["ops_per_sec"]
+            if speed < 1 - threshold:
+                regressions.append(
+                    f"{shape}.{phase}: {speed:.2f}x ops/sec of the baseline"
+                )
+            if base["peak_memory"] and (
+                result["peak_memory"] / base["peak_memory"] > 1 + threshold
+            ):
+                regressions.append(
+                    f"{shape}.{phase}: peak memory {result['peak_memory']} "
+                    f"bytes, baseline {base['peak_memory']} bytes"
+                )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--save", help="Save the results as baseline JSON file.")
+    parser.add_argument("--compare", help="Baseline JSON file to compare with.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed slowdown or memory growth ratio (default: 0.2).",
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.2,
+        help="Minimum seconds each phase is repeated for (default: 0.2).",
+    )
+    parser.add_argument("--shape", action="append", help="Only run these shapes.")
+    args = parser.parse_args(argv)
+
+    results: dict[str, Any] = {}
+    for shape in SHAPES:
+        if args.shape and shape.name not in args.shape:
+            continue
+        results[shape.name] = bench_shape(shape, args.min_time)
+        print(f"{shape.name}  {asdict(shape)}")
+        for phase, result in results[shape.name].items():
+            print(
+                f"  {phase:<8} {result['ops_per_sec']:>14,.1f} ops/sec"
+                f"  {result['peak_memory']:>14,} bytes peak"
+            )
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print("No regressions against the baseline.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,3 +1,31 @@
-__all__ = ["from_string"]
+__all__ = [
+    "arender",
+    "columns_from_string",
+    "from_file",
+    "from_string",
+    "iter_from_string",
+    "compile",
+    "compile_file",
+    "CompiledTemplate",
+    "TemplateSlice",
+    "ColumnarOutput",
+    "ExpansionTypes",
+    "RenderStats",
+    "TemplateCache",
+    "template_cache",
+]
 
-from .parser import from_string
+from .aio import arender
+from .cache import TemplateCache, template_cache
+from .columnar import ColumnarOutput
+from .entities import ExpansionTypes
+from .parser import (
+    columns_from_string,
+    compile,
+    compile_file,
+    from_file,
+    from_string,
+    iter_from_string,
+)
+from .stats import RenderStats
+from .template import CompiledTemplate, TemplateSlice
@@ -0,0 +1,84 @@
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, AsyncIterator
+
+from .entities import ExpansionTypes
+from .parser import compile as compile_template
+from .template import CompiledTemplate
+
+DEFAULT_BATCH_SIZE = 100
+
+
+def _render_range(
+    template: CompiledTemplate, start: int, stop: int
+) -> list[dict[str, Any]]:
+    return list(template[start:stop])
+
+
+async def arender(
+    template: CompiledTemplate | str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    offload: bool = False,
+    executor: Executor | None = None,
+    expansion: ExpansionTypes = ExpansionTypes.ZIP,
+) -> AsyncIterator[dict[str, Any]]:
+    """Asynchronously iterate over the generated jsons of a template,
+    without blocking the event loop for the whole render.
+
+    Generated jsons are rendered in batches only when the consumer asks
+    for them, so a slow consumer holds back the rendering. Control is
+    given back to the event loop after each batch. With offload, batches
+    are rendered in an executor instead of the event loop thread, and the
+    next batch is rendered while the current one is consumed.
+
+    e.g:
+        async for document in json_factory.arender(json_string):
+            await queue.put(document)
+
+    Args:
+        template (CompiledTemplate | str): A compiled template, or a JSON
+            string with custom syntax to compile.
+        batch_size (int): Number of generated jsons rendered between two
+            yields to the event loop.
+        offload (bool): Render the batches in an executor.
+        executor (Executor | None): The executor used with offload, the
+            event loop default executor if None. A process pool executor
+            receives the pickled template with each batch.
+        expansion (ExpansionTypes): How the variable ranges are expanded,
+            only used if template is a JSON string.
+    Returns:
+        AsyncIterator[dict[str, Any]]: An async iterator over the generated
+            JSON objects.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1.")
+    if isinstance(template, str):
+        template = compile_template(template, expansion=expansion)
+
+    range_size = len(template)
+    batch_starts = range(0, range_size, batch_size)
+
+    if not offload:
+        for start in batch_starts:
+            for document in template[start : start + batch_size]:
+                yield document
+            await asyncio.sleep(0)
+        return
+
+    loop = asyncio.get_running_loop()
+
+    def submit(start: int) -> asyncio.Future:
+        stop = min(start + batch_size, range_size)
+        return loop.run_in_executor(executor, _render_range, template, start, stop)
+
+    pending = submit(batch_starts[0]) if batch_starts else None
+    for next_start in batch_starts[1:]:
+        batch = await pending
+        # Render the next batch while the current one is consumed
+        pending = submit(next_start)
+        for document in batch:
+            yield document
+
+    if pending is not None:
+        for document in await pending:
+            yield document
@@ -0,0 +1,120 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Hashable
+
+if TYPE_CHECKING:
+    from .template import CompiledTemplate
+
+DEFAULT_MAX_SIZE = 128
+DEFAULT_MAX_TEXT_BYTES = 64 * 1024 * 1024
+
+
+def _get_key(json_string: str, options: Hashable) -> tuple[tuple, int]:
+    """Return the cache key of a template and its size in bytes."""
+    encoded = json_string.encode("utf-8", "surrogatepass")
+    return (hashlib.blake2b(encoded, digest_size=32).digest(), options), len(
+        encoded
+    )
+
+
+class TemplateCache:
+    """Thread-safe LRU cache of compiled templates, keyed by a hash of the
+    template text and the compile options.
+
+    The cache is bounded both by number of templates and by the total size
+    in bytes of their (utf-8 encoded) template text. Templates larger than
+    max_text_bytes are compiled but never cached.
+
+    The text size is not the memory retained by a cached template: its
+    literals, structure and generated render functions are built lazily on
+    first render and can take several times the size of the template text.
+    Lower max_size to bound the memory used by large templates.
+    """
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_MAX_SIZE,
+        max_text_bytes: int = DEFAULT_MAX_TEXT_BYTES,
+    ):
+        self.max_size = max_size
+        """Maximum number of cached templates, 0 disables the cache."""
+        self.max_text_bytes = max_text_bytes
+        """Maximum total size in bytes of the cached template texts, not of
+        the memory retained by the compiled templates."""
+        self.hits = 0
+        """Number of lookups that found a cached template."""
+        self.misses = 0
+        """Number of lookups that had to compile the template."""
+
+        self._lock = threading.Lock()
+        self._templates: OrderedDict[tuple, tuple["CompiledTemplate", int]] = (
+            OrderedDict()
+        )
+        self._text_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    @property
+    def text_bytes(self) -> int:
+        """Total size in bytes of the cached template texts."""
+        return self._text_bytes
+
+    def get_or_compile(
+        self,
+        json_string: str,
+        options: Hashable,
+        compile_template: Callable[[], "CompiledTemplate"],
+    ) -> "CompiledTemplate":
+        """Return the cached template of the json_string and compile options,
+        compiling and caching it on a miss.
+
+        Args:
+            json_string (str): The JSON string with custom syntax.
+            options (Hashable): The compile options, part of the cache key.
+            compile_template (Callable[[], CompiledTemplate]): Compiles the
+                template on a miss.
+        Returns:
+            CompiledTemplate: The compiled template.
+        """
+        key, size = _get_key(json_string, options)
+
+        with self._lock:
+            cached = self._templates.get(key)
+            if cached is not None:
+                self._templates.move_to_end(key)
+                self.hits += 1
+                return cached[0]
+            self.misses += 1
+
+        # Compile outside of the lock, so other threads are not blocked
+        template = compile_template()
+
+        if self.max_size <= 0 or size > self.max_text_bytes:
+            return template
+
+        with self._lock:
+            if key not in self._templates:
+                self._templates[key] = (template, size)
+                self._text_bytes += size
+                while (
+                    len(self._templates) > self.max_size
+                    or self._text_bytes > self.max_text_bytes
+                ):
+                    _, (_, evicted_size) = self._templates.popitem(last=False)
+                    self._text_bytes -= evicted_size
+
+        return template
+
+    def clear(self):
+        """Remove every cached template and reset the hit/miss counters."""
+        with self._lock:
+            self._templates.clear()
+            self._text_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+
+template_cache = TemplateCache()
+"""Process-wide cache used by compile, from_string and iter_from_string."""
@@ -0,0 +1,131 @@
+import argparse
+import sys
+from typing import Sequence
+
+from .entities import ExpansionTypes
+from .exceptions import (
+    RangeSizeNotDefinedError,
+    VariableAlreadyInitializedError,
+    VariableNotInitializedError,
+)
+from .parser import compile as compile_template
+from .parser import compile_file
+from .writers import write_json_array, write_ndjson
+
+OUTPUT_FORMATS = {
+    "ndjson": write_ndjson,
+    "json": write_json_array,
+}
+
+
+def _create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="json-factory",
+        description="Generate multiple JSON objects from a json-factory template.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    render_parser = subparsers.add_parser(
+        "render",
+        help="Render a template file and stream the generated JSON objects.",
+    )
+    render_parser.add_argument(
+        "template", help="Path of the template file, or - to read from stdin."
+    )
+    render_parser.add_argument(
+        "-o",
+        "--output",
+        default="-",
+        help="Path of the output file, or - to write to stdout (default).",
+    )
+    render_parser.add_argument(
+        "-f",
+        "--format",
+        choices=sorted(OUTPUT_FORMATS),
+        default="ndjson",
+        help="ndjson writes one JSON object per line (default), "
+        "json writes a single JSON array.",
+    )
+    render_parser.add_argument(
+        "--expansion",
+        choices=[expansion.value for expansion in ExpansionTypes],
+        default=ExpansionTypes.ZIP.value,
+        help="How the variable ranges are expanded (default: zip).",
+    )
+    render_parser.add_argument(
+        "--shard",
+        type=_parse_shard,
+        metavar="K/N",
+        help="Render only shard K of N (K from 0 to N - 1).",
+    )
+    render_parser.add_argument(
+        "--strided",
+        action="store_true",
+        help="Shards take every N-th index instead of a contiguous block.",
+    )
+    return parser
+
+
+def _parse_shard(value: str) -> tuple[int, int]:
+    try:
+        shard, shards = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid shard '{value}', expected K/N, e.g: 0/4"
+        ) from None
+    return shard, shards
+
+
+def _render(args: argparse.Namespace) -> int:
+    expansion = ExpansionTypes(args.expansion)
+    if args.template == "-":
+        template = compile_template(sys.stdin.read(), expansion=expansion)
+    else:
+        template = compile_file(args.template, expansion=expansion)
+    write = OUTPUT_FORMATS[args.format]
+
+    indexes = range(len(template))
+    if args.shard:
+        indexes = template.shard_indexes(*args.shard, strided=args.strided)
+
+    if args.output == "-":
+        write(template, sys.stdout, indexes)
+        sys.stdout.flush()
+    else:
+        with open(args.output, "w", encoding="utf-8", newline="\n") as output:
+            write(template, output, indexes)
+
+    if args.shard:
+        # Report the exact global indexes written by this shard
+        print(
+            f"json-factory: shard {args.shard[0]}/{args.shard[1]} rendered "
+            f"{len(indexes)} indexes: range({indexes.start}, {indexes.stop}, "
+            f"{indexes.step})",
+            file=sys.stderr,
+        )
+
+    return 0
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Entry point of the json-factory command.
+
+    Args:
+        argv (Sequence[str] | None): The command line arguments, sys.argv
+            if None.
+    Returns:
+        int: The exit code.
+    """
+    args = _create_parser().parse_args(argv)
+
+    try:
+        return _render(args)
+    except (
+        OSError,
+        ValueError,
+        RangeSizeNotDefinedError,
+        VariableAlreadyInitializedError,
+        VariableNotInitializedError,
+    ) as exc:
+        print(f"json-factory: error: {exc}", file=sys.stderr)
+        return 1
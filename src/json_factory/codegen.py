@@ -0,0 +1,160 @@
+# pylint: disable=protected-access
+import logging
+from typing import TYPE_CHECKING, Any, Callable
+
+from .entities import ExpansionTypes, Variable, VariableModifier
+from .modifiers import (
+    MODIFIER_REGISTRY,
+    _to_int_factory,
+    _to_string_factory,
+    _zfill_factory,
+)
+from .structure import string_source
+
+if TYPE_CHECKING:
+    from .template import CompiledTemplate
+
+logger = logging.getLogger(__name__)
+
+
+class GeneratedRender:
+    """Render functions generated and compiled for a single template, with
+    its literals as constants and each reference as an inlined expression."""
+
+    __slots__ = ("source", "render_string", "render_compact_string", "build")
+
+    def __init__(self, source: str, namespace: dict[str, Any]):
+        self.source = source
+        """The generated python source of the functions."""
+        self.render_string: Callable[[int], str] = namespace["render_string"]
+        """Render the generated json at an index as JSON string."""
+        self.render_compact_string: Callable[[int], str] | None = namespace.get(
+            "render_compact_string"
+        )
+        """Same as render_string without the template whitespace, None if
+        the template can't be compacted."""
+        self.build: Callable[[int], Any] | None = namespace.get("build")
+        """Build the generated json at an index as python object, raising
+        StructureFallback if it must be decoded instead. None if the template
+        can't be rendered structurally."""
+
+
+def _modifier_source(
+    modifier: VariableModifier, value: str, namespace: dict[str, Any]
+) -> str:
+    """Get the python expression applying a modifier to a value expression.
+    Builtin modifiers are inlined, others are called from the namespace."""
+    factory = MODIFIER_REGISTRY[modifier.type]
+    if factory is _zfill_factory:
+        return f"str({value}).zfill({int(modifier.args[0])})"
+    if factory is _to_string_factory:
+        return f"('\"' + str({value}) + '\"')"
+    if factory is _to_int_factory:
+        return f"int(str({value}).replace('\"', '').replace(\"'\", ''))"
+
+    name = f"_m{len(namespace)}"
+    namespace[name] = factory(modifier.args)
+    return f"{name}({value})"
+
+
+def _variable_source(
+    variable: Variable, index: str, namespace: dict[str, Any]
+) -> str:
+    """Get the python expression of the value of a variable at an index."""
+    values = variable.range
+    if isinstance(values, range):
+        source = index if values.step == 1 else f"{values.step} * {index}"
+        return source if values.start == 0 else f"{values.start} + {source}"
+
+    name = f"_r{len(namespace)}"
+    namespace[name] = values
+    return f"{name}[{index}]"
+
+
+def _values_source(template: "CompiledTemplate", namespace: dict[str, Any]) -> str:
+    """Get the python statements computing the raw value of each value
+    column of the index i into the c0, c1, ... variables."""
+    variables = list(template.declared_variables)
+    lines = []
+
+    if template.expansion is ExpansionTypes.PRODUCT:
+        lines.append(f"if i < 0 or i >= {template.declared_range_size}:")
+        lines.append("    raise IndexError('Index out of range.')")
+        # Mixed radix decoding, the last declared variable changing fastest
+        lines.append("n = i")
+        for position in range(len(variables) - 1, 0, -1):
+            radix = len(variables[position].range)
+            lines.append(f"n, i{position} = divmod(n, {radix})")
+        indexes = ["n"] + [f"i{position}" for position in range(1, len(variables))]
+    else:
+        size = min(
+            [template.declared_range_size]
+            + [len(variable.range) for variable in variables]
+        )
+        lines.append(f"if i < 0 or i >= {size}:")
+        lines.append("    raise IndexError('Index out of range.')")
+        indexes = ["i"] * len(variables)
+
+    for position, variable in enumerate(variables):
+        value = _variable_source(variable, indexes[position], namespace)
+        lines.append(f"v{position} = {value}")
+
+    for column, ((_, reference), position) in enumerate(
+        zip(template._columns, template._column_variables)
+    ):
+        value = f"v{position}"
+        for modifier in reference.modifiers:
+            value = _modifier_source(modifier, value, namespace)
+        lines.append(f"c{column} = {value}")
+
+    return "\n".join(f"    {line}" for line in lines)
+
+
+def _generate_source(template: "CompiledTemplate", namespace: dict[str, Any]) -> str:
+    """Generate the python source of the render functions of a template."""
+    values = _values_source(template, namespace)
+    slots = [f"c{column}" for column in template._slot_columns]
+
+    functions = [
+        f"def render_string(i):\n{values}\n"
+        f"    return {string_source(template._literals, slots)}\n"
+    ]
+
+    compact_literals = template._compact_literals
+    if compact_literals is not None:
+        functions.append(
+            f"def render_compact_string(i):\n{values}\n"
+            f"    return {string_source(compact_literals, slots)}\n"
+        )
+
+    structure = template._render_structure
+    if structure is not None:
+        statements, expression = structure.source(namespace)
+        placements = "".join(f"    {statement}\n" for statement in statements)
+        functions.append(
+            f"def build(i):\n{values}\n{placements}    return {expression}\n"
+        )
+
+    return "\n\n".join(functions)
+
+
+def generate_render(template: "CompiledTemplate") -> GeneratedRender | None:
+    """Generate and compile the python source of the render functions of a
+    template.
+
+    Args:
+        template (CompiledTemplate): The parsed template.
+    Returns:
+        GeneratedRender | None: The compiled functions, or None if the
+            template is too large or nested to be compiled.
+    """
+    namespace: dict[str, Any] = {}
+    try:
+        source = _generate_source(template, namespace)
+        code = compile(source, "<json_factory template>", "exec")
+    except (SyntaxError, RecursionError, MemoryError) as exc:
+        logger.debug("Can't generate the render functions: %s", exc)
+        return None
+
+    exec(code, namespace)  # pylint: disable=exec-used
+    return GeneratedRender(source, namespace)
@@ -0,0 +1,52 @@
+import copy
+from dataclasses import dataclass
+from typing import Any
+
+from .structure import JsonPath
+
+
+def get_path(document: Any, path: JsonPath) -> Any:
+    """Get the value at a json path of a document."""
+    for key in path:
+        document = document[key]
+    return document
+
+
+@dataclass
+class ColumnarOutput:
+    """The generated jsons of a template stored as its invariant base json
+    once, plus one column of values per varying json path.
+
+    e.g: {"name": "shot_$frame(<1-3>)", "type": "shot"} is stored as
+        base = {"name": None, "type": "shot"}
+        columns = {("name",): ["shot_1", "shot_2", "shot_3"]}
+    """
+
+    base: Any
+    """The json parts shared by every generated json, with None at each
+    varying json path."""
+    columns: dict[JsonPath, list[Any]]
+    """The value of each generated json at each varying json path, keyed by
+    the keys and list indexes leading to it."""
+    indexes: range
+    """The range indexes of the generated jsons, in column order."""
+
+    def __len__(self) -> int:
+        return len(self.indexes)
+
+    def document(self, position: int) -> Any:
+        """Rebuild a full generated json from the base and the columns.
+
+        Args:
+            position (int): Position of the generated json in the columns,
+                not its range index.
+        Returns:
+            Any: A new copy of the generated JSON object.
+        """
+        document = copy.deepcopy(self.base)
+        for path, values in self.columns.items():
+            value = values[position]
+            if not path:
+                return value
+            get_path(document, path[:-1])[path[-1]] = value
+        return document
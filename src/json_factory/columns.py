@@ -0,0 +1,108 @@
+from typing import Any, Sequence
+
+from .entities import VariableModifier, VariableModifierTypes
+from .modifiers import (
+    MODIFIER_REGISTRY,
+    ModifierFunction,
+    _to_string_factory,
+    _zfill_factory,
+)
+
+try:
+    import numpy
+except ImportError:  # NumPy is an optional dependency
+    numpy = None
+
+COLUMN_BLOCK_SIZE = 4096
+"""Number of indexes whose value columns are formatted in one batch."""
+
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+
+# Modifiers with a NumPy implementation, used only while the builtin
+# factory is registered for them
+_NUMPY_MODIFIERS = {
+    VariableModifierTypes.ZFILL: _zfill_factory,
+    VariableModifierTypes.TO_STRING: _to_string_factory,
+}
+
+
+def take_values(values: Sequence[Any], indexes: range) -> Sequence[Any]:
+    """Get the values at the given indexes, as a lazy range for range
+    operator values.
+
+    Raises:
+        IndexError: If an index is out of the values range.
+    """
+    if not indexes:
+        return ()
+    first, last = indexes[0], indexes[-1]
+    if min(first, last) < 0 or max(first, last) >= len(values):
+        raise IndexError("Index out of range.")
+
+    if isinstance(values, range):
+        start = values[first]
+        step = values.step * indexes.step
+        return range(start, start + step * len(indexes), step)
+    return [values[index] for index in indexes]
+
+
+def _can_use_numpy(
+    values: Sequence[Any], modifiers: Sequence[VariableModifier]
+) -> bool:
+    """Check if the values can be formatted with NumPy string operations."""
+    return (
+        numpy is not None
+        and isinstance(values, range)
+        and len(values) > 1
+        and _INT64_MIN <= min(values.start, values.stop) <= _INT64_MAX
+        and _INT64_MIN <= max(values.start, values.stop) <= _INT64_MAX
+        and all(
+            MODIFIER_REGISTRY.get(mod.type) is _NUMPY_MODIFIERS.get(mod.type)
+            for mod in modifiers
+        )
+    )
+
+
+def _format_with_numpy(
+    values: range, modifiers: Sequence[VariableModifier]
+) -> list[str]:
+    """Apply a chain of zfill and to_string modifiers to a range of
+    integers with NumPy string operations."""
+    # numpy.strings only exists since NumPy 2.0
+    strings = getattr(numpy, "strings", None) or numpy.char
+
+    text = numpy.arange(
+        values.start, values.stop, values.step, dtype=numpy.int64
+    ).astype(str)
+    for mod in modifiers:
+        if mod.type is VariableModifierTypes.ZFILL:
+            text = strings.zfill(text, int(mod.args[0]))
+        else:
+            text = strings.add(strings.add('"', text), '"')
+    return text.tolist()
+
+
+def format_column(
+    values: Sequence[Any],
+    modifiers: Sequence[VariableModifier],
+    pipeline: ModifierFunction | None,
+) -> Sequence[Any]:
+    """Apply the modifier chain of a reference to a block of variable values
+    at once.
+
+    Integer ranges with zfill and to_string modifiers are formatted with
+    NumPy when it is installed, any other column with the compiled pipeline.
+
+    Args:
+        values (Sequence[Any]): The variable values of the block.
+        modifiers (Sequence[VariableModifier]): The modifiers of the reference.
+        pipeline (ModifierFunction | None): The compiled modifiers.
+    Returns:
+        Sequence[Any]: The value of the reference for each variable value.
+    """
+    if pipeline is None:
+        return values
+    if _can_use_numpy(values, modifiers):
+        return _format_with_numpy(values, modifiers)
+    return [pipeline(value) for value in values]
@@ -1,9 +1,12 @@
 from abc import ABC
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any
+from typing import Any, Callable, Iterator, Sequence
 
-from .exceptions import VariableNotInitializedError
+from .exceptions import (
+    VariableAlreadyInitializedError,
+    VariableNotInitializedError,
+)
 
 
 class VariableModifierTypes(Enum):
@@ -24,30 +27,48 @@ class VariableModifierTypes(Enum):
         except KeyError:
             return None
     
-@dataclass
+class ExpansionTypes(Enum):
+    """Enum for how the variable ranges are expanded into generated jsons."""
+
+    ZIP = "zip"
+    """All variables share the same range size and advance in lockstep."""
+    PRODUCT = "product"
+    """Each variable keeps its own range size and every combination of
+    values is generated (cartesian product)."""
+
+
+@dataclass(slots=True)
 class VariableModifier(ABC):
-    """Class representing a variable modifier."""
+    """Class representing a variable modifier. Identical modifiers of a
+    template are parsed into a single shared object."""
     name : str
     type : VariableModifierTypes
     char_size : int
     args: list[Any] = field(default_factory=list)
 
-@dataclass
+@dataclass(slots=True)
 class VariableReference:
     """Class representing a variable reference. that is simply an object that holds
     the reference position in the json string, so it can be replaced with the Variable value.
+
+    References are slotted and share their modifier chain with the identical
+    chains of the template, so each one costs a few machine words.
     """
 
     start_loc: int = 0
     """Start location of the variable reference in the JSON string."""
     end_loc: int = 0
     """End location of the variable reference in the JSON string."""
-    modifiers : list[VariableModifier] = field(default_factory=list)
-    """List of modifiers applied to the variable."""
+    modifiers : tuple[VariableModifier, ...] = ()
+    """Modifiers applied to the variable, in order."""
+    pipeline : Callable[[Any], Any] | None = field(
+        default=None, repr=False, compare=False
+    )
+    """Modifiers compiled into a single function, None if there are no modifiers."""
     
     def add_modifier(self, modifier: VariableModifier):
         """Add a modifier to the variable reference."""
-        self.modifiers.append(modifier)
+        self.modifiers = (*self.modifiers, modifier)
         
     def get_total_declaration_char_size(self) -> int:
         """Calculate the total character size of the variable declaration."""
@@ -56,13 +77,14 @@ class VariableReference:
             total_size += mod.char_size
         return total_size
 
-@dataclass
+@dataclass(slots=True)
 class Variable:
     """Stores the variable name, its declaration position, and its range value."""
 
     name: str
     declaration: VariableReference
-    range: list[Any] = field(default_factory=list)
+    range: Sequence[Any] = field(default_factory=tuple)
+    """Values of the variable, a lazy range object for range operators."""
     references: list[VariableReference] = field(default_factory=list)
 
     def __post_init__(self):
@@ -77,40 +99,50 @@ class Variable:
         if index < 0 or index >= len(self.range):
             raise IndexError("Index out of range.")
         range_value = self.range[index]
-        
-        # TODO: Modifier logic should not be implemented here, only executed
-        # find a way to fix this
-        for mod in reference.modifiers:
-            if mod.name == "zfill":
-                range_value = str(range_value).zfill(int(mod.args[0]))
-            if mod.name == "to_string":
-                range_value = str(f'"{range_value}"')
-            if mod.name == "to_int":
-                range_value = int(str(range_value).replace('"', '').replace("'", ""))
-                
-        return range_value
+
+        # Modifiers are compiled at parse time into a single function
+        if reference.pipeline is None:
+            return range_value
+        return reference.pipeline(range_value)
 
     def add_reference(self, reference: VariableReference):
         """Add a reference to the variable."""
         self.references.append(reference)
 
 
-class VariableList(list):
-    """Custom list class to handle Variable objects."""
+class VariableList:
+    """Symbol table of the declared Variable objects, indexed by name
+    and iterated in declaration order."""
+
+    __slots__ = ("_variables",)
+
+    def __init__(self):
+        self._variables: dict[str, Variable] = {}
 
     def __contains__(self, item):
         if isinstance(item, str):
-            return any(var.name == item for var in self)
-        return super().__contains__(item)
+            return item in self._variables
+        return self._variables.get(item.name) is item
+
+    def __iter__(self) -> Iterator[Variable]:
+        return iter(self._variables.values())
+
+    def __len__(self) -> int:
+        return len(self._variables)
 
     def append(self, item: Variable):
-        # Optional: prevent duplicates by name
-        super().append(item)
+        """Add a declared variable to the table."""
+        if item.name in self._variables:
+            raise VariableAlreadyInitializedError(
+                f"Variable '{item.name}' was already initialized."
+            )
+        self._variables[item.name] = item
 
     def get_variable(self, name: str) -> Variable:
         """Get a variable by its name."""
-        for var in self:
-            if var.name == name:
-                return var
-
-        raise VariableNotInitializedError(f"Variable '{name}' not found.")
\ No newline at end of file
+        try:
+            return self._variables[name]
+        except KeyError:
+            raise VariableNotInitializedError(
+                f"Variable '{name}' not found."
+            ) from None
@@ -0,0 +1,152 @@
+import re
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable
+
+from .constants import VALID_VARIABLE_CHARS
+from .entities import VariableModifierTypes
+from .exceptions import VariableNotInitializedError
+
+_VALID_CHARS_CLASS = "[" + re.escape("".join(sorted(VALID_VARIABLE_CHARS))) + "]"
+
+# Variable names are case insensitive, e.g: $Current_Frame
+_VARIABLE_NAME_PATTERN = re.compile(_VALID_CHARS_CLASS + "*", re.IGNORECASE)
+# Modifier names too, e.g: .zfill(3) or .To_String()
+_MODIFIER_PATTERN = re.compile(
+    r"\.(" + _VALID_CHARS_CLASS + r"+)\(([^)]*)\)", re.IGNORECASE
+)
+
+# The same patterns for utf-8 encoded templates, e.g: memory mapped files
+_BYTES_VARIABLE_NAME_PATTERN = re.compile(
+    _VARIABLE_NAME_PATTERN.pattern.encode(), re.IGNORECASE
+)
+_BYTES_MODIFIER_PATTERN = re.compile(
+    _MODIFIER_PATTERN.pattern.encode(), re.IGNORECASE
+)
+
+Buffer = str | bytes | bytearray
+"""A template text, or its utf-8 encoding in any buffer supporting
+find and slicing (e.g: mmap.mmap)."""
+
+
+def _decode_utf8(data: bytes) -> str:
+    """Decode a slice of a utf-8 encoded template."""
+    return data.decode("utf-8")
+
+
+class TokenTypes(Enum):
+    """Enum for template token types."""
+
+    LITERAL = "literal"
+    """Template text without custom syntax."""
+    DECLARATION = "declaration"
+    """Variable declaration with its expression, e.g: $frame(<0-3>)"""
+    REFERENCE = "reference"
+    """Reference to a declared variable, e.g: $frame"""
+    MODIFIER = "modifier"
+    """Modifier applied to the previous declaration or reference, e.g: .zfill(3)"""
+
+
+@dataclass(slots=True)
+class Token:
+    """A token of the template with its position in the json string."""
+
+    type: TokenTypes
+    start: int
+    """Start location of the token in the JSON string."""
+    end: int
+    """End location of the token in the JSON string."""
+    name: str = ""
+    """Variable name (including the $) or modifier name."""
+    args: str = ""
+    """Declaration expression or modifier argument."""
+
+
+def tokenize(json_string: Buffer) -> list[Token]:
+    """Split the json_string in a single pass into literal, declaration,
+    reference and modifier tokens.
+
+    Utf-8 encoded templates are scanned without decoding them, only the
+    variable names and expressions are decoded, and token locations are
+    byte offsets.
+
+    Args:
+        json_string (Buffer): The JSON string to process.
+    Returns:
+        list[Token]: The tokens, ordered by position.
+    """
+    if isinstance(json_string, str):
+        marker, open_paren, close_paren = "$", "(", ")"
+        name_pattern, modifier_pattern = _VARIABLE_NAME_PATTERN, _MODIFIER_PATTERN
+        decode: Callable[..., str] = str
+    else:
+        marker, open_paren, close_paren = b"$", b"(", b")"
+        name_pattern = _BYTES_VARIABLE_NAME_PATTERN
+        modifier_pattern = _BYTES_MODIFIER_PATTERN
+        decode = _decode_utf8
+
+    tokens: list[Token] = []
+    literal_start = 0
+
+    var_init_pos = json_string.find(marker)
+    while var_init_pos != -1:
+        if var_init_pos > literal_start:
+            tokens.append(Token(TokenTypes.LITERAL, literal_start, var_init_pos))
+
+        var_end_pos = name_pattern.match(json_string, var_init_pos + 1).end()
+        variable_name = decode(json_string[var_init_pos:var_end_pos])
+
+        # Variable initialization has an expression after the variable name
+        # e.g: $current_frame(<0-3>)
+        if json_string[var_end_pos : var_end_pos + 1] == open_paren:
+            expr_end_pos = json_string.find(close_paren, var_end_pos)
+            if expr_end_pos == -1:
+                raise VariableNotInitializedError(
+                    f"Variable '{variable_name}' was declared but not initialized."
+                )
+            tokens.append(
+                Token(
+                    TokenTypes.DECLARATION,
+                    var_init_pos,
+                    expr_end_pos + 1,
+                    name=variable_name,
+                    args=decode(json_string[var_end_pos + 1 : expr_end_pos]),
+                )
+            )
+            var_end_pos = expr_end_pos + 1
+        else:
+            tokens.append(
+                Token(
+                    TokenTypes.REFERENCE,
+                    var_init_pos,
+                    var_end_pos,
+                    name=variable_name,
+                )
+            )
+
+        # Chained modifiers, e.g: $current_frame.zfill(3).to_string()
+        while True:
+            modifier_match = modifier_pattern.match(json_string, var_end_pos)
+            if not modifier_match:
+                break
+            modifier_name = decode(modifier_match.group(1)).lower()
+            if not VariableModifierTypes.get_type_from_name(modifier_name):
+                break
+            tokens.append(
+                Token(
+                    TokenTypes.MODIFIER,
+                    var_end_pos,
+                    modifier_match.end(),
+                    name=modifier_name,
+                    args=decode(modifier_match.group(2)),
+                )
+            )
+            var_end_pos = modifier_match.end()
+
+        literal_start = var_end_pos
+        var_init_pos = json_string.find(marker, var_end_pos)
+
+    if literal_start < len(json_string):
+        tokens.append(Token(TokenTypes.LITERAL, literal_start, len(json_string)))
+
+    return tokens
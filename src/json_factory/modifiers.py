@@ -0,0 +1,84 @@
+from functools import partial
+from typing import Any, Callable, Sequence
+
+from .entities import VariableModifier, VariableModifierTypes
+
+ModifierFunction = Callable[[Any], Any]
+"""Function that applies a modifier to a variable value."""
+ModifierFactory = Callable[[list[Any]], ModifierFunction]
+"""Function that receives the modifier args and returns its ModifierFunction."""
+
+MODIFIER_REGISTRY: dict[VariableModifierTypes, ModifierFactory] = {}
+"""Registered modifier factories, keyed by modifier type."""
+
+
+def register_modifier(modifier_type: VariableModifierTypes):
+    """Decorator that registers a ModifierFactory for a modifier type.
+
+    The ModifierFactory is called once per reference at parse time, so
+    parsing the modifier args is never repeated for each value. The
+    returned ModifierFunction must be picklable (e.g: a module level
+    function or a functools.partial of one) for parallel rendering.
+    """
+
+    def decorator(factory: ModifierFactory) -> ModifierFactory:
+        MODIFIER_REGISTRY[modifier_type] = factory
+        return factory
+
+    return decorator
+
+
+def _zfill(value: Any, width: int) -> str:
+    return str(value).zfill(width)
+
+
+def _to_string(value: Any) -> str:
+    return f'"{value}"'
+
+
+def _to_int(value: Any) -> int:
+    return int(str(value).replace('"', "").replace("'", ""))
+
+
+@register_modifier(VariableModifierTypes.ZFILL)
+def _zfill_factory(args: list[Any]) -> ModifierFunction:
+    return partial(_zfill, width=int(args[0]))
+
+
+@register_modifier(VariableModifierTypes.TO_STRING)
+def _to_string_factory(args: list[Any]) -> ModifierFunction:
+    return _to_string
+
+
+@register_modifier(VariableModifierTypes.TO_INT)
+def _to_int_factory(args: list[Any]) -> ModifierFunction:
+    return _to_int
+
+
+def _apply_chain(functions: tuple[ModifierFunction, ...], value: Any) -> Any:
+    for function in functions:
+        value = function(value)
+    return value
+
+
+def compile_modifiers(
+    modifiers: Sequence[VariableModifier],
+) -> ModifierFunction | None:
+    """Compile a chain of modifiers into a single ModifierFunction.
+
+    Args:
+        modifiers (Sequence[VariableModifier]): The modifiers, in the order they
+            are applied.
+    Returns:
+        ModifierFunction | None: The function applying the whole chain, or
+            None if there are no modifiers.
+    """
+    functions = tuple(
+        MODIFIER_REGISTRY[mod.type](mod.args) for mod in modifiers
+    )
+
+    if not functions:
+        return None
+    if len(functions) == 1:
+        return functions[0]
+    return partial(_apply_chain, functions)
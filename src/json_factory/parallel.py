@@ -0,0 +1,66 @@
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, Iterator
+
+if TYPE_CHECKING:
+    from .template import CompiledTemplate
+
+# Chunks are big enough to amortize the inter-process overhead, but small
+# enough to balance the work between the workers
+MAX_CHUNK_SIZE = 10_000
+CHUNKS_PER_WORKER = 4
+
+# Template of the current worker process, sent once by the pool initializer
+_worker_template: "CompiledTemplate | None" = None
+
+
+def _init_worker(template: "CompiledTemplate"):
+    global _worker_template  # pylint: disable=global-statement
+    _worker_template = template
+
+
+def _render_chunk(start: int, stop: int) -> list[dict[str, Any]]:
+    return list(_worker_template[start:stop])
+
+
+def iter_render_parallel(
+    template: "CompiledTemplate",
+    workers: int,
+    chunk_size: int | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Render the generated jsons of the template in a process pool,
+    splitting the index space in chunks, and yield them in order.
+
+    The template is sent once to each worker process. At most two chunks
+    per worker are in flight, so memory stays bounded when the consumer
+    is slower than the workers.
+
+    Args:
+        template (CompiledTemplate): The parsed template.
+        workers (int): Number of worker processes.
+        chunk_size (int | None): Number of generated jsons per chunk,
+            computed from the range size and the workers if None.
+    Returns:
+        Iterator[dict[str, Any]]: An iterator over the generated JSON objects.
+    """
+    range_size = len(template)
+    if chunk_size is None:
+        chunk_size = -(-range_size // (workers * CHUNKS_PER_WORKER))
+        chunk_size = max(1, min(MAX_CHUNK_SIZE, chunk_size))
+
+    executor = ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(template,)
+    )
+    pending: deque[Future] = deque()
+
+    try:
+        for start in range(0, range_size, chunk_size):
+            stop = min(start + chunk_size, range_size)
+            pending.append(executor.submit(_render_chunk, start, stop))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        executor.shutdown(cancel_futures=True)
@@ -1,8 +1,13 @@
-import json
-from typing import Any
-
-from .constants import VALID_VARIABLE_CHARS
+import math
+import mmap
+import os
+import time
+from typing import Any, Iterator, Sequence
+
+from .cache import template_cache
+from .columnar import ColumnarOutput
 from .entities import (
+    ExpansionTypes,
     Variable,
     VariableList,
     VariableModifier,
@@ -14,57 +19,39 @@ from .exceptions import (
     VariableAlreadyInitializedError,
     VariableNotInitializedError,
 )
-
-
-def _replace_variable_with_value(
-    json_string: str,
-    start_pos: int,
-    value: Any,
-    total_declaration_char_size: int,
-) -> str:
-    """Replace variable with value and return the new version of the json_string
-
-    Args:
-        json_string (str): The JSON string to process.
-        start_pos (int): The position in the JSON string where the variable starts.
-        value (Any): The value to replace the variable with.
-        total_declaration_char_size (int): The total character size of
-            the variable declaration, including modifier chars.
-    """
-    return (
-        json_string[:start_pos]
-        + str(value)
-        + json_string[start_pos + total_declaration_char_size :]
-    )
-
-
-def _get_variable_positions(json_string: str) -> list[int]:
-    """Find all $ and its positions in the json_string."""
-    return [i for i, char in enumerate(json_string) if char == "$"]
+from .lexer import Buffer, TokenTypes, tokenize
+from .modifiers import compile_modifiers
+from .stats import RenderStats
+from .template import CompiledTemplate, RenderHook
 
 
 def _parse_variable_expression(
     variable_expr: str,
-) -> tuple[list[Any], None | Exception]:
-    """Parse the variable expression and return the range value."""
+) -> tuple[Sequence[Any], None | Exception]:
+    """Parse the variable expression and return the range value.
+
+    Range operator values are returned as lazy range objects, so their
+    memory doesn't grow with the range size. List operator values are
+    returned as tuples.
+    """
 
-    range_value = []
+    range_value: Sequence[Any] = ()
 
     # Parse "[]" operator
-    # e.g: $current_frame([0,2,5,6]) -> [0, 2, 5, 6]
+    # e.g: $current_frame([0,2,5,6]) -> (0, 2, 5, 6)
     if variable_expr.startswith("[") and variable_expr.endswith("]"):
         # Extract the range size from the variable expression
         range_size_str = variable_expr.split("[")[1].split("]")[0]
         try:
-            range_value = [int(x) for x in range_size_str.split(",")]
+            range_value = tuple(int(x) for x in range_size_str.split(","))
         except ValueError as exc:
-            return [], exc
+            return (), exc
 
     # Parse "<>" operator
     # e.g:
-    # $current_frame(<3>) -> [0, 1, 2, 3]
-    # $current_frame(<0-3>) -> [0, 1, 2, 3]
-    # $current_frame(<0-10>{2}) -> [0, 2, 4, 6, 8, 10] # With step 2
+    # $current_frame(<3>) -> range(0, 4)
+    # $current_frame(<0-3>) -> range(0, 4)
+    # $current_frame(<0-10>{2}) -> range(0, 11, 2) # With step 2
     if variable_expr.startswith("<") and variable_expr.endswith(">"):
         # Extract the range size from the variable expression
         range_size_str = variable_expr.split("<")[1].split(">")[0]
@@ -86,32 +73,36 @@ def _parse_variable_expression(
                 range_start = int(range_part.split("-")[0])
                 range_end = int(range_part.split("-")[1])
 
-            # Generate the range with the step
-            range_values = [x for x in range(range_start, range_end + 1, step)]
-
-            return range_values, None
+            # Generate the range with the step, without materializing it
+            return range(range_start, range_end + 1, step), None
         except ValueError as exc:
-            return [], exc
+            return (), exc
 
     return range_value, None
 
 
-def from_string(json_string: str) -> list[dict[str, Any]]:
-    """Process the json_string with custom syntax and return a list
-    of the generated jsons as python dict.
+def _parse_template(
+    json_string: Buffer,
+    expansion: ExpansionTypes = ExpansionTypes.ZIP,
+    stats: RenderStats | None = None,
+) -> tuple[VariableList, int]:
+    """Scan the json_string for variable declarations, references and
+    modifiers and return the declared variables with the global range size.
 
     Args:
-        json_string (str): The JSON string to process.
+        json_string (Buffer): The JSON string to process, or its utf-8
+            encoding.
+        expansion (ExpansionTypes): How the variable ranges are expanded.
+        stats (RenderStats | None): Optional stats recording the scan time.
     Returns:
-        list[dict[str, Any]]: A list of generated JSON objects as Python dictionaries.
+        tuple[VariableList, int]: The declared variables and the global range size.
     """
-
     # =====================
     # Initialization
     # =====================
 
     # Store all variables in the program
-    declared_variables: list[Variable] = VariableList()
+    declared_variables = VariableList()
     # The first initialized variable sets the global range size
     # if no variable is initialized, the range size is 1 and the standard json
     # will be returned
@@ -121,60 +112,54 @@ def from_string(json_string: str) -> list[dict[str, Any]]:
     # Parser Init
     # =====================
 
-    # find all $ and its positions in the job task string
-    variable_positions = _get_variable_positions(json_string)
+    # The reference that the following modifier tokens are applied to
+    variable_reference: None | VariableReference = None
+    # Identical modifiers are parsed into a single shared object
+    # e.g: every ".zfill(3)" of the template
+    modifiers: dict[tuple[str, str, int], VariableModifier] = {}
 
-    # Populate the variable list with all variables found in the job task string
-    for var_init_pos in variable_positions:
-        var_end_pos = var_init_pos
-        for i in range(var_init_pos, len(json_string)):
-            if not i == var_init_pos:  # ignore first character "$"
-                if not json_string[i].lower() in VALID_VARIABLE_CHARS:
-                    break
-            var_end_pos += 1
+    scan_start = time.perf_counter() if stats is not None else 0.0
+    tokens = tokenize(json_string)
+    if stats is not None:
+        stats.scan_time += time.perf_counter() - scan_start
 
-        variable_name = json_string[var_init_pos:var_end_pos]
-        variable_reference: None | VariableReference = None
+    for token in tokens:
 
-        # check if is a variable initialization
-        # Variable initialization has an expression after the variable name
-        # e.g: $current_frame(<0-3>)
-        if json_string[var_end_pos] == "(":
+        if token.type is TokenTypes.DECLARATION:
+            variable_name = token.name
 
             if variable_name in declared_variables:
                 raise VariableAlreadyInitializedError(
                     f"Variable '{variable_name}' was already initialized."
                 )
 
-            variable_expr = json_string[var_end_pos + 1 :]
-            if ")" in variable_expr:
-                variable_expr = variable_expr.split(")")[0]
-            else:
-                raise VariableNotInitializedError(
-                    f"Variable '{variable_name}' was declared but not initialized."
-                )
-            range_value, exc = _parse_variable_expression(variable_expr)
+            range_value, exc = _parse_variable_expression(token.args)
             if not range_value and exc:
                 raise VariableNotInitializedError(
                     f"Variable '{variable_name}' has an invalid range size."
                 ) from exc
 
-            # Defines the global range size from the first initialized variable
-            if declared_range_size == 1 and range_value:
-                declared_range_size = len(range_value)
-            else:
-                # If the global range size is already defined,
-                # check if the current variable has the same size
-                # if not raise an error
-                if declared_range_size != len(range_value):
+            # With product expansion each variable keeps its own range size
+            if expansion is ExpansionTypes.PRODUCT:
+                # An empty range would silently generate no jsons at all
+                if not range_value:
                     raise RangeSizeNotDefinedError(
-                        f"Variable has a range size({range_value}) that does not match the global range({declared_range_size})."
+                        f"Variable '{variable_name}' has an empty range."
                     )
+            else:
+                # Defines the global range size from the first initialized variable
+                if declared_range_size == 1 and range_value:
+                    declared_range_size = len(range_value)
+                else:
+                    # If the global range size is already defined,
+                    # check if the current variable has the same size
+                    # if not raise an error
+                    if declared_range_size != len(range_value):
+                        raise RangeSizeNotDefinedError(
+                            f"Variable has a range size({range_value}) that does not match the global range({declared_range_size})."
+                        )
 
-            var_end_pos += len(variable_expr) + 2  # +2 for the parentheses
-            variable_reference = VariableReference(
-                var_init_pos, var_end_pos, modifiers=[]
-            )
+            variable_reference = VariableReference(token.start, token.end)
 
             declared_variables.append(
                 Variable(
@@ -183,114 +168,312 @@ def from_string(json_string: str) -> list[dict[str, Any]]:
                     declaration=variable_reference,
                 )
             )
-        else:
+
+        elif token.type is TokenTypes.REFERENCE:
+            variable_name = token.name
             variable_data = declared_variables.get_variable(variable_name)
             if not variable_data:
                 raise VariableNotInitializedError(
                     f"Variable '{variable_name}' was declared but not initialized."
                 )
-            variable_reference = VariableReference(var_init_pos, var_end_pos)
+            variable_reference = VariableReference(token.start, token.end)
             variable_data.add_reference(variable_reference)
 
-        # Check for variable modifiers recursively
-        # e.g: $current_frame.zfill(3).to_string()
-
-        cursor = var_end_pos
-        modifier_start_pos = var_end_pos
-        found_modifiers: list[VariableModifier] = []
-
-        while True:
-            char = json_string[cursor]
-            if (
-                not char in [".", "(", ")"]
-                and not char in VALID_VARIABLE_CHARS
-            ):
-                break
-
-            if char == ".":
-                # get zfill and the value inside of the parentheses
-                modifier = json_string[modifier_start_pos + 1 :]
-                if "(" in modifier and ")" in modifier:
-
-                    modifier_name = modifier.split("(")[0]
-                    modifier_type = VariableModifierTypes.get_type_from_name(
-                        modifier_name
-                    )
+        elif token.type is TokenTypes.MODIFIER:
+            # e.g: $current_frame.zfill(3).to_string()
+            modifier_key = (token.name, token.args, token.end - token.start)
+            modifier = modifiers.get(modifier_key)
+            if modifier is None:
+                modifier = modifiers[modifier_key] = VariableModifier(
+                    name=token.name,
+                    type=VariableModifierTypes.get_type_from_name(token.name),
+                    char_size=token.end - token.start,
+                    args=[token.args],
+                )
+            variable_reference.add_modifier(modifier)
+
+    # Identical modifier chains share a single tuple, and are compiled once
+    # into a single function, so rendering only calls it once per value
+    chains: dict[tuple[int, ...], tuple[tuple[VariableModifier, ...], Any]] = {}
+    for variable in declared_variables:
+        for reference in variable.references:
+            chain_key = tuple(id(modifier) for modifier in reference.modifiers)
+            chain = chains.get(chain_key)
+            if chain is None:
+                chain = chains[chain_key] = (
+                    reference.modifiers,
+                    compile_modifiers(reference.modifiers),
+                )
+            reference.modifiers, reference.pipeline = chain
 
-                    if not modifier_type:
-                        cursor += 1
-                        modifier_start_pos = cursor
-                        continue
+    if expansion is ExpansionTypes.PRODUCT:
+        declared_range_size = math.prod(
+            len(variable.range) for variable in declared_variables
+        )
 
-                    modifier_value = modifier.split("(")[1].split(")")[0]
+    return declared_variables, declared_range_size
 
-                    # +3 for the parentheses and the dot
-                    # e.g: ".zfill(3)"
-                    modifier_char_size = (
-                        len(modifier_name) + len(modifier_value) + 3
-                    )
 
-                    found_modifiers.append(
-                        VariableModifier(
-                            name=modifier_name,
-                            type=modifier_type,
-                            char_size=modifier_char_size,
-                            args=[modifier_value],
-                        )
-                    )
-
-                    cursor += modifier_char_size
-                    modifier_start_pos = cursor
-                    continue
+def compile(  # pylint: disable=redefined-builtin
+    json_string: str,
+    structural: bool = False,
+    expansion: ExpansionTypes = ExpansionTypes.ZIP,
+    use_cache: bool = True,
+    stats: RenderStats | None = None,
+    share_static: bool = False,
+    codegen: bool = False,
+) -> CompiledTemplate:
+    """Parse the json_string with custom syntax once and return a
+    CompiledTemplate that can render the generated jsons any number of times.
 
-            cursor += 1
+    Args:
+        json_string (str): The JSON string to process.
+        structural (bool): Build the generated jsons directly from a parsed
+            object tree of the template instead of decoding a rendered
+            JSON string for each of them. Faster for templates with large
+            constant parts, slower for templates dominated by references.
+        expansion (ExpansionTypes): How the variable ranges are expanded.
+            ZIP (default) requires every variable to have the same range
+            size, PRODUCT generates every combination of values.
+        use_cache (bool): Reuse the template from the process-wide
+            template_cache if the same json_string was already compiled
+            with the same options.
+        stats (RenderStats | None): Optional stats recording the scan and
+            parse times and the template counters.
+        share_static (bool): Render structurally, building the json
+            objects and arrays without references once and return the same
+            object in every generated json, instead of a new copy each time.
+            Mutating a shared object changes it in every generated json of
+            the template, including the ones rendered later.
+        codegen (bool): Generate and compile a python function specialized
+            for the template on first render, with its literals as constants
+            and each reference as an inlined expression.
+    Returns:
+        CompiledTemplate: The parsed template.
+    """
+    compiled = False
+
+    def compile_template() -> CompiledTemplate:
+        nonlocal compiled
+        compiled = True
+        return _compile_template(
+            json_string, structural, expansion, stats, share_static, codegen
+        )
+
+    if use_cache:
+        template = template_cache.get_or_compile(
+            json_string,
+            (structural, expansion, share_static, codegen),
+            compile_template,
+        )
+    else:
+        template = compile_template()
+
+    _count_template(template, stats, cache_hit=not compiled)
+    return template
+
+
+def compile_file(
+    path: str | os.PathLike,
+    structural: bool = False,
+    expansion: ExpansionTypes = ExpansionTypes.ZIP,
+    stats: RenderStats | None = None,
+    share_static: bool = False,
+    codegen: bool = False,
+) -> CompiledTemplate:
+    """Parse a utf-8 encoded template file once and return a CompiledTemplate.
+
+    The file is memory mapped and scanned for variables without reading it
+    into a string first, only its literal segments are decoded, so large
+    templates are loaded with about one copy of their text in memory.
+    File templates are not cached, as the file can change between calls.
 
-        for mod in found_modifiers:
-            variable_reference.add_modifier(mod)
+    Args:
+        path (str | os.PathLike): Path of the template file.
+        structural (bool): Build the generated jsons directly from a parsed
+            object tree of the template, see compile.
+        expansion (ExpansionTypes): How the variable ranges are expanded.
+        stats (RenderStats | None): Optional stats recording the scan and
+            parse times and the template counters.
+        share_static (bool): Share the json objects and arrays without
+            references between the generated jsons, see compile.
+        codegen (bool): Generate a python function specialized for the
+            template, see compile.
+    Returns:
+        CompiledTemplate: The parsed template.
+    """
+    with open(path, "rb") as template_file:
+        # Empty files can't be memory mapped
+        if os.fstat(template_file.fileno()).st_size == 0:
+            template = _compile_template(
+                "", structural, expansion, stats, share_static, codegen
+            )
+        else:
+            with mmap.mmap(
+                template_file.fileno(), 0, access=mmap.ACCESS_READ
+            ) as buffer:
+                template = _compile_template(
+                    buffer, structural, expansion, stats, share_static, codegen
+                )
 
-    # =====================
-    # Generate each json
-    # =====================
+    _count_template(template, stats, cache_hit=False)
+    return template
+
+
+def _compile_template(
+    json_string: Buffer,
+    structural: bool,
+    expansion: ExpansionTypes,
+    stats: RenderStats | None,
+    share_static: bool,
+    codegen: bool,
+) -> CompiledTemplate:
+    """Parse the json_string into a CompiledTemplate, recording the scan
+    and parse times into the stats."""
+    start = time.perf_counter() if stats is not None else 0.0
+    scan_time = stats.scan_time if stats is not None else 0.0
+
+    declared_variables, declared_range_size = _parse_template(
+        json_string, expansion, stats
+    )
+    template = CompiledTemplate(
+        json_string,
+        declared_variables,
+        declared_range_size,
+        structural=structural,
+        expansion=expansion,
+        share_static=share_static,
+        codegen=codegen,
+    )
 
-    generated_jsons: list[dict[str, Any]] = []
+    if stats is not None:
+        # Everything but the scan is accounted as parse time
+        stats.parse_time += time.perf_counter() - start - (stats.scan_time - scan_time)
+    return template
+
+
+def _count_template(
+    template: CompiledTemplate, stats: RenderStats | None, cache_hit: bool
+):
+    """Record the template counters into the stats."""
+    if stats is None:
+        return
+    stats.templates += 1
+    stats.cache_hits += cache_hit
+    stats.variables += len(template.declared_variables)
+    stats.references += sum(
+        len(variable.references) for variable in template.declared_variables
+    )
 
-    for i in range(declared_range_size):
-        generated_json_string = json_string
 
-        # After each variable replacement, the string length changes
-        # so we need to keep track of the offset to replace the variable correctly
+def from_string(
+    json_string: str,
+    on_render: RenderHook | None = None,
+    expansion: ExpansionTypes = ExpansionTypes.ZIP,
+    workers: int | None = None,
+    stats: RenderStats | None = None,
+    share_static: bool = False,
+) -> list[dict[str, Any]]:
+    """Process the json_string with custom syntax and return a list
+    of the generated jsons as python dict.
 
-        loc_offset = 0
+    Args:
+        json_string (str): The JSON string to process.
+        on_render (RenderHook | None): Optional callback called with the
+            index and the generated JSON string before it is decoded.
+        expansion (ExpansionTypes): How the variable ranges are expanded.
+        workers (int | None): Number of worker processes to render with,
+            rendering in the current process if None or 1.
+        stats (RenderStats | None): Optional stats recording the phase
+            timings and counters.
+        share_static (bool): Share the json objects and arrays without
+            references between the generated jsons, see compile.
+    Returns:
+        list[dict[str, Any]]: A list of generated JSON objects as Python dictionaries.
+    """
+    return compile(
+        json_string, expansion=expansion, stats=stats, share_static=share_static
+    ).render_all(on_render, workers, stats)
 
-        for variable in declared_variables:
 
-            # Replace each reference with the variable value for the
-            # current range index
+def iter_from_string(
+    json_string: str,
+    on_render: RenderHook | None = None,
+    expansion: ExpansionTypes = ExpansionTypes.ZIP,
+    workers: int | None = None,
+    stats: RenderStats | None = None,
+    share_static: bool = False,
+) -> Iterator[dict[str, Any]]:
+    """Process the json_string with custom syntax and lazily yield each
+    generated json as python dict, as soon as it is rendered.
+
+    The template is parsed eagerly, so syntax errors are raised on call,
+    but only one generated json is held in memory at a time.
 
-            for reference in variable.references:
+    Args:
+        json_string (str): The JSON string to process.
+        on_render (RenderHook | None): Optional callback called with the
+            index and the generated JSON string before it is decoded.
+        expansion (ExpansionTypes): How the variable ranges are expanded.
+        workers (int | None): Number of worker processes to render with,
+            rendering in the current process if None or 1.
+        stats (RenderStats | None): Optional stats recording the phase
+            timings and counters.
+        share_static (bool): Share the json objects and arrays without
+            references between the generated jsons, see compile.
+    Returns:
+        Iterator[dict[str, Any]]: An iterator over the generated JSON objects.
+    """
+    return compile(
+        json_string, expansion=expansion, stats=stats, share_static=share_static
+    ).iter_render(on_render, workers, stats)
+
+
+def from_file(
+    path: str | os.PathLike,
+    on_render: RenderHook | None = None,
+    expansion: ExpansionTypes = ExpansionTypes.ZIP,
+    workers: int | None = None,
+    stats: RenderStats | None = None,
+    share_static: bool = False,
+) -> list[dict[str, Any]]:
+    """Process a utf-8 encoded template file with custom syntax and return
+    a list of the generated jsons as python dict, see compile_file.
 
-                variable_value = variable.get_range_value_from_reference(
-                    i, reference
-                )
+    Args:
+        path (str | os.PathLike): Path of the template file.
+        on_render (RenderHook | None): Optional callback called with the
+            index and the generated JSON string before it is decoded.
+        expansion (ExpansionTypes): How the variable ranges are expanded.
+        workers (int | None): Number of worker processes to render with,
+            rendering in the current process if None or 1.
+        stats (RenderStats | None): Optional stats recording the phase
+            timings and counters.
+        share_static (bool): Share the json objects and arrays without
+            references between the generated jsons, see compile.
+    Returns:
+        list[dict[str, Any]]: A list of generated JSON objects as Python dictionaries.
+    """
+    return compile_file(
+        path, expansion=expansion, stats=stats, share_static=share_static
+    ).render_all(on_render, workers, stats)
 
-                result = _replace_variable_with_value(
-                    generated_json_string,
-                    reference.start_loc + loc_offset,
-                    variable_value,
-                    reference.get_total_declaration_char_size(),
-                )
 
-                loc_offset += len(result) - len(generated_json_string)
-                generated_json_string = result
+def columns_from_string(
+    json_string: str,
+    expansion: ExpansionTypes = ExpansionTypes.ZIP,
+    stats: RenderStats | None = None,
+) -> ColumnarOutput:
+    """Process the json_string with custom syntax and return the invariant
+    base json once, plus one column of values per json path where a
+    reference sits, see CompiledTemplate.render_columns.
 
-        # write to file
-        print(generated_json_string)
-        try:
-            generated_jsons.append(json.loads(generated_json_string))
-        except json.JSONDecodeError as exc:
-            print(generated_json_string)
-            raise ValueError(
-                f"Generated JSON for index {i} is not valid: {exc}"
-            ) from exc
-
-    return generated_jsons
+    Args:
+        json_string (str): The JSON string to process.
+        expansion (ExpansionTypes): How the variable ranges are expanded.
+        stats (RenderStats | None): Optional stats recording the scan and
+            parse times and the template counters.
+    Returns:
+        ColumnarOutput: The base json and the varying value columns.
+    """
+    return compile(json_string, expansion=expansion, stats=stats).render_columns()
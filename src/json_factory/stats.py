@@ -0,0 +1,39 @@
+from dataclasses import asdict, dataclass
+
+
+@dataclass
+class RenderStats:
+    """Phase timings and counters of template compiling and rendering.
+
+    Pass an instance as the stats argument of compile, from_string,
+    iter_from_string or the CompiledTemplate render methods to record it.
+    Values are accumulated across every call the instance is passed to.
+    Without a stats object nothing is measured.
+    """
+
+    scan_time: float = 0.0
+    """Seconds spent tokenizing templates."""
+    parse_time: float = 0.0
+    """Seconds spent parsing tokens and building compiled templates."""
+    render_time: float = 0.0
+    """Seconds spent computing reference values and rendering json strings."""
+    decode_time: float = 0.0
+    """Seconds spent building python objects (json.loads or structural)."""
+    templates: int = 0
+    """Number of compiled templates, including cache hits."""
+    cache_hits: int = 0
+    """Number of templates taken from the template cache."""
+    variables: int = 0
+    """Number of declared variables of the compiled templates."""
+    references: int = 0
+    """Number of references (including declarations) of the compiled templates."""
+    documents: int = 0
+    """Number of generated jsons."""
+    modifiers_applied: int = 0
+    """Number of modifier function calls while rendering."""
+    bytes_produced: int = 0
+    """UTF-8 size of the generated JSON text."""
+
+    def as_dict(self) -> dict[str, float | int]:
+        """Return the stats as a flat dict, to export to metrics systems."""
+        return asdict(self)
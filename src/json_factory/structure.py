@@ -0,0 +1,446 @@
+import json
+import math
+import re
+from typing import Any, Sequence
+
+# Private use unicode characters delimit the slot markers placed in the
+# skeleton json. Templates that already contain them are not rendered
+# structurally.
+# Bare slots (e.g: "key": $var) are replaced by a whole json string,
+# string slots (e.g: "key": "name_$var") only by the marker text.
+_BARE_SLOT_START = "\ue000"
+_BARE_SLOT_END = "\ue001"
+_STRING_SLOT_START = "\ue002"
+_STRING_SLOT_END = "\ue003"
+
+_BARE_SLOT_PATTERN = re.compile(f"{_BARE_SLOT_START}(\\d+){_BARE_SLOT_END}")
+_STRING_SLOT_PATTERN = re.compile(f"{_STRING_SLOT_START}(\\d+){_STRING_SLOT_END}")
+_MARKER_CHARS = re.compile(
+    f"[{_BARE_SLOT_START}{_BARE_SLOT_END}{_STRING_SLOT_START}{_STRING_SLOT_END}]"
+)
+
+# A json string token that can be decoded by simply removing its quotes
+_PLAIN_STRING_TOKEN = re.compile(r'"[^"\\\x00-\x1f]*"')
+# Quotes and escape sequences, to find out which slots are inside json strings
+_QUOTES_AND_ESCAPES = re.compile(r'"|\\.?', re.DOTALL)
+# Json whitespace, together with quotes and escapes to skip json strings
+_WHITESPACE_QUOTES_AND_ESCAPES = re.compile(r'[ \t\n\r]+|"|\\.?', re.DOTALL)
+# Characters that would change the meaning of a json string if inserted raw
+_UNSAFE_STRING_CHARS = re.compile(r'["\\\x00-\x1f]')
+
+
+JsonPath = tuple[str | int, ...]
+"""Keys and list indexes leading to a value of a json document."""
+
+
+MAX_STRUCTURE_DEPTH = 100
+"""Maximum nesting of json objects and arrays rendered structurally, the
+nodes are built recursively, so deeper templates use string rendering."""
+
+
+class StructureFallback(Exception):
+    """Raised when a value can't be placed structurally and the generated
+    json must be rendered as string and decoded instead."""
+
+
+def string_source(literals: Sequence[str], expressions: Sequence[str]) -> str:
+    """Get a python f-string expression joining the literals with the
+    values of the expressions placed between each pair of them."""
+    parts = [repr(literals[0])]
+    for expression, literal in zip(expressions, literals[1:]):
+        parts.append(f"f'{{{expression}}}'")
+        parts.append(repr(literal))
+    # Adjacent string literals are compiled into a single f-string
+    return "(" + " ".join(parts) + ")"
+
+
+class _Node:
+    """Base class of the nodes of a template structure."""
+
+    __slots__ = ()
+
+    def build(self, values: list[Any]) -> Any:
+        """Build the python object of this node from the slot values."""
+        raise NotImplementedError
+
+    def source(self, namespace: dict[str, Any]) -> str:
+        """Get a python expression building this node, reading the value
+        of each placement from the p0, p1, ... variables. Objects that have
+        no literal expression are added to the namespace."""
+        raise NotImplementedError
+
+
+class _Constant(_Node):
+    """Json scalar without references."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def build(self, values: list[Any]) -> Any:
+        return self.value
+
+    def source(self, namespace: dict[str, Any]) -> str:
+        value = self.value
+        if value is None or isinstance(value, (bool, int, str)) or (
+            isinstance(value, float) and math.isfinite(value)
+        ):
+            return repr(value)
+        # Shared objects and non finite floats
+        name = f"_k{len(namespace)}"
+        namespace[name] = value
+        return name
+
+
+class _Slot(_Node):
+    """Bare reference used directly as a json value."""
+
+    __slots__ = ("index",)
+
+    def __init__(self, index: int):
+        self.index = index
+
+    def build(self, values: list[Any]) -> Any:
+        return values[self.index]
+
+    def source(self, namespace: dict[str, Any]) -> str:
+        return f"p{self.index}"
+
+
+class _StringTemplate(_Node):
+    """Json string with references inside of it."""
+
+    __slots__ = ("literals", "indexes")
+
+    def __init__(self, literals: list[str], indexes: list[int]):
+        self.literals = literals
+        self.indexes = indexes
+
+    def build(self, values: list[Any]) -> Any:
+        literals = self.literals
+        parts = [literals[0]]
+        for i, value_index in enumerate(self.indexes):
+            parts.append(values[value_index])
+            parts.append(literals[i + 1])
+        return "".join(parts)
+
+    def source(self, namespace: dict[str, Any]) -> str:
+        return string_source(self.literals, [f"p{i}" for i in self.indexes])
+
+
+class _Dict(_Node):
+    """Json object, rebuilt for each generated json."""
+
+    __slots__ = ("items",)
+
+    def __init__(self, items: list[tuple[_Node, _Node]]):
+        self.items = items
+
+    def build(self, values: list[Any]) -> Any:
+        return {
+            key.build(values): value.build(values) for key, value in self.items
+        }
+
+    def source(self, namespace: dict[str, Any]) -> str:
+        items = ", ".join(
+            f"{key.source(namespace)}: {value.source(namespace)}"
+            for key, value in self.items
+        )
+        return "{" + items + "}"
+
+
+class _List(_Node):
+    """Json array, rebuilt for each generated json."""
+
+    __slots__ = ("items",)
+
+    def __init__(self, items: list[_Node]):
+        self.items = items
+
+    def build(self, values: list[Any]) -> Any:
+        return [item.build(values) for item in self.items]
+
+    def source(self, namespace: dict[str, Any]) -> str:
+        return "[" + ", ".join(item.source(namespace) for item in self.items) + "]"
+
+
+def _decode_bare_value(value: Any) -> Any:
+    """Decode a value placed as a bare json token, the same way json.loads
+    would decode its string representation."""
+    if type(value) is int:  # pylint: disable=unidiomatic-typecheck
+        return value
+
+    token = str(value)
+    if _PLAIN_STRING_TOKEN.fullmatch(token):
+        return token[1:-1]
+    try:
+        return json.loads(token)
+    except json.JSONDecodeError as exc:
+        raise StructureFallback() from exc
+
+
+def _encode_string_value(value: Any) -> str:
+    """Return the text of a value placed inside of a json string."""
+    text = str(value)
+    if _UNSAFE_STRING_CHARS.search(text):
+        raise StructureFallback()
+    return text
+
+
+class TemplateStructure:
+    """Python object tree of a template with placeholder nodes, so each
+    generated json is built directly instead of decoding a json string."""
+
+    def __init__(self, root: _Node, placements: list[tuple[int, bool]]):
+        self.root = root
+        """Root node of the template."""
+        self.placements = placements
+        """Distinct (value column, is bare json value) pairs of the slots,
+        the placeholder nodes refer to them by index."""
+
+    def get_values(self, column_values: Sequence[Any]) -> list[Any]:
+        """Convert the raw value of each value column into the value of
+        each placement.
+
+        Raises:
+            StructureFallback: If a value can't be placed structurally.
+        """
+        return [
+            _decode_bare_value(column_values[column])
+            if bare
+            else _encode_string_value(column_values[column])
+            for column, bare in self.placements
+        ]
+
+    def build(self, column_values: Sequence[Any]) -> Any:
+        """Build the generated json from the raw value of each value column.
+
+        Raises:
+            StructureFallback: If a value can't be placed structurally.
+        """
+        return self.root.build(self.get_values(column_values))
+
+    def source(self, namespace: dict[str, Any]) -> tuple[list[str], str]:
+        """Get the python statements converting the raw value columns, read
+        from the c0, c1, ... variables, into the placement values, and the
+        expression building the generated json from them.
+
+        The statements raise StructureFallback, same as build.
+        """
+        namespace["_decode_bare_value"] = _decode_bare_value
+        namespace["_encode_string_value"] = _encode_string_value
+
+        statements = []
+        for index, (column, bare) in enumerate(self.placements):
+            if bare:
+                # Integers are already their decoded value
+                statements.append(
+                    f"p{index} = c{column} if type(c{column}) is int "
+                    f"else _decode_bare_value(c{column})"
+                )
+            else:
+                statements.append(f"p{index} = _encode_string_value(c{column})")
+        return statements, self.root.source(namespace)
+
+    def split_varying(self) -> tuple[Any, list[tuple[JsonPath, _Node]]]:
+        """Split the template into its invariant base json, with None in
+        place of each varying value, and the json path and node of each
+        varying value, in document order.
+
+        Raises:
+            StructureFallback: If a reference is inside of a key, so the
+                paths themselves vary.
+        """
+        sites: list[tuple[JsonPath, _Node]] = []
+
+        def split(node: _Node, path: JsonPath) -> Any:
+            if isinstance(node, _Constant):
+                return node.value
+            if isinstance(node, _Dict):
+                base = {}
+                for key, item in node.items:
+                    if not isinstance(key, _Constant):
+                        raise StructureFallback()
+                    base[key.value] = split(item, path + (key.value,))
+                return base
+            if isinstance(node, _List):
+                return [split(item, path + (i,)) for i, item in enumerate(node.items)]
+            sites.append((path, node))
+            return None
+
+        base = split(self.root, ())
+        return base, sites
+
+
+def _split_string(string: str) -> _Node:
+    """Create the node of a json string from the skeleton json."""
+    if _BARE_SLOT_START not in string and _STRING_SLOT_START not in string:
+        return _Constant(string)
+
+    bare_match = _BARE_SLOT_PATTERN.fullmatch(string)
+    if bare_match:
+        return _Slot(int(bare_match.group(1)))
+
+    parts = _STRING_SLOT_PATTERN.split(string)
+    if len(parts) == 1:
+        return _Constant(string)
+
+    # re.split alternates literal text and captured value indexes
+    return _StringTemplate(parts[0::2], [int(i) for i in parts[1::2]])
+
+
+def _create_node(value: Any, share_static: bool = False, depth: int = 0) -> _Node:
+    """Create the node of a value from the skeleton json.
+
+    With share_static, objects and arrays without references are returned
+    as a constant node holding the decoded value, shared by every build.
+    """
+    if depth > MAX_STRUCTURE_DEPTH and isinstance(value, (dict, list)):
+        raise StructureFallback()
+
+    if isinstance(value, dict):
+        items = []
+        for key, item in value.items():
+            key_node = _split_string(key)
+            if isinstance(key_node, _Slot):
+                # Bare references are not valid json keys
+                raise StructureFallback()
+            items.append((key_node, _create_node(item, share_static, depth + 1)))
+        if share_static and all(
+            isinstance(key, _Constant) and isinstance(item, _Constant)
+            for key, item in items
+        ):
+            return _Constant(value)
+        return _Dict(items)
+    if isinstance(value, list):
+        items = [_create_node(item, share_static, depth + 1) for item in value]
+        if share_static and all(isinstance(item, _Constant) for item in items):
+            return _Constant(value)
+        return _List(items)
+    if isinstance(value, str):
+        return _split_string(value)
+    return _Constant(value)
+
+
+def _count_markers(skeleton: Any) -> int:
+    """Count the marker characters in the strings and keys of the decoded
+    skeleton json."""
+    count = 0
+    pending = [skeleton]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, dict):
+            for key, item in value.items():
+                count += len(_MARKER_CHARS.findall(key))
+                pending.append(item)
+        elif isinstance(value, list):
+            pending.extend(value)
+        elif isinstance(value, str):
+            count += len(_MARKER_CHARS.findall(value))
+    return count
+
+
+def build_structure(
+    literals: list[str], slot_columns: list[int], share_static: bool = False
+) -> TemplateStructure | None:
+    """Parse the template literals once into a TemplateStructure.
+
+    Args:
+        literals (list[str]): The literal segments of the template, with one
+            reference slot between each pair of segments.
+        slot_columns (list[int]): The value column of each slot.
+        share_static (bool): Build the objects and arrays without references
+            once, and return the same object in every generated json.
+    Returns:
+        TemplateStructure | None: The template structure, or None if the
+            template can't be rendered structurally.
+    """
+    if any(_MARKER_CHARS.search(literal) for literal in literals):
+        return None
+
+    # Find out if each slot is inside of a json string
+    bare_slots: list[bool] = []
+    in_string = False
+
+    for literal in literals[:-1]:
+        for match in _QUOTES_AND_ESCAPES.finditer(literal):
+            if match.group() == '"':
+                in_string = not in_string
+            elif len(match.group()) == 1:
+                # The reference value would be escaped by the template
+                return None
+        bare_slots.append(not in_string)
+
+    # Slots with the same value column and placement share their value
+    placements: list[tuple[int, bool]] = []
+    placement_indexes: dict[tuple[int, bool], int] = {}
+
+    skeleton_parts = [literals[0]]
+    for slot_index, bare in enumerate(bare_slots):
+        placement = (slot_columns[slot_index], bare)
+        if placement not in placement_indexes:
+            placement_indexes[placement] = len(placements)
+            placements.append(placement)
+        placement_index = placement_indexes[placement]
+
+        if bare:
+            skeleton_parts.append(
+                f'"{_BARE_SLOT_START}{placement_index}{_BARE_SLOT_END}"'
+            )
+        else:
+            skeleton_parts.append(
+                f"{_STRING_SLOT_START}{placement_index}{_STRING_SLOT_END}"
+            )
+        skeleton_parts.append(literals[slot_index + 1])
+
+    try:
+        skeleton = json.loads("".join(skeleton_parts))
+    except (json.JSONDecodeError, RecursionError):
+        return None
+
+    # Json escapes in the literals (e.g: \ue000) can decode to the marker
+    # characters, so the markers must be exactly the ones placed by slots
+    if _count_markers(skeleton) != 2 * len(bare_slots):
+        return None
+
+    try:
+        root = _create_node(skeleton, share_static)
+    except StructureFallback:
+        return None
+
+    return TemplateStructure(root, placements)
+
+
+def compact_literals(literals: list[str]) -> list[str] | None:
+    """Remove the json whitespace outside of json strings from the template
+    literals, so the rendered json strings fit in a single line.
+
+    Args:
+        literals (list[str]): The literal segments of the template, with one
+            reference slot between each pair of segments.
+    Returns:
+        list[str] | None: The compact literals, or None if the template
+            can't be compacted without decoding it.
+    """
+    compact: list[str] = []
+    in_string = False
+
+    for literal in literals:
+        parts = []
+        cursor = 0
+        for match in _WHITESPACE_QUOTES_AND_ESCAPES.finditer(literal):
+            token = match.group()
+            if token == '"':
+                in_string = not in_string
+            elif token[0] == "\\":
+                if len(token) == 1:
+                    # The reference value would be escaped by the template
+                    return None
+            elif not in_string:
+                parts.append(literal[cursor : match.start()])
+                cursor = match.end()
+        parts.append(literal[cursor:])
+        compact.append("".join(parts))
+
+    return compact
@@ -0,0 +1,703 @@
+import json
+import logging
+import time
+from functools import cached_property
+from typing import Any, Callable, Iterable, Iterator, Sequence, overload
+
+from .columnar import ColumnarOutput, get_path
+from .codegen import GeneratedRender, generate_render
+from .columns import COLUMN_BLOCK_SIZE, format_column, take_values
+from .entities import ExpansionTypes, Variable, VariableList, VariableReference
+from .lexer import Buffer
+from .parallel import iter_render_parallel
+from .stats import RenderStats
+from .structure import (
+    StructureFallback,
+    TemplateStructure,
+    build_structure,
+    compact_literals,
+)
+
+logger = logging.getLogger(__name__)
+
+RenderHook = Callable[[int, str], None]
+"""Callback receiving the range index and the generated JSON string."""
+
+
+def _get_render_hook(on_render: RenderHook | None) -> RenderHook | None:
+    """Return the hook to call for each generated json, adding the debug
+    logging hook only if the json_factory logger has DEBUG enabled.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return on_render
+
+    def debug_hook(index: int, json_string: str):
+        logger.debug("Generated JSON for index %s: %s", index, json_string)
+        if on_render is not None:
+            on_render(index, json_string)
+
+    return debug_hook
+
+
+class CompiledTemplate(Sequence):
+    """A json_string with custom syntax that was already parsed, so the
+    generated jsons can be rendered any number of times without paying
+    the parsing cost again.
+    """
+
+    def __init__(
+        self,
+        json_string: Buffer,
+        declared_variables: VariableList,
+        declared_range_size: int,
+        structural: bool = False,
+        expansion: ExpansionTypes = ExpansionTypes.ZIP,
+        share_static: bool = False,
+        codegen: bool = False,
+    ):
+        # Utf-8 encoded templates (e.g: memory mapped files) are not kept,
+        # only their literal segments are decoded
+        is_text = isinstance(json_string, str)
+
+        self.json_string: str | None = json_string if is_text else None
+        """The original JSON string with custom syntax, None if the template
+        was compiled from an encoded buffer."""
+        self.declared_variables = declared_variables
+        """All variables declared in the template, in declaration order."""
+        self.declared_range_size = declared_range_size
+        """Number of jsons generated by the template."""
+        self.expansion = expansion
+        """How the variable ranges are expanded into generated jsons."""
+
+        # With product expansion, each output index is decoded on the fly
+        # into one range index per variable (mixed radix, the last declared
+        # variable changing fastest), so no combination list is materialized
+        self._variable_radixes = [
+            len(variable.range) for variable in declared_variables
+        ]
+        variable_positions = {
+            variable.name: position
+            for position, variable in enumerate(declared_variables)
+        }
+
+        # Pre-split the template into literal segments and reference slots,
+        # ordered by position, so each output is a single join:
+        # literals[0] + slot[0] + literals[1] + ... + slot[n-1] + literals[n]
+        self._literals: list[str] = []
+
+        # References of the same variable with identical modifier chains
+        # share a value column, computed once per index and reused by
+        # every slot pointing at it
+        self._columns: list[tuple[Variable, VariableReference]] = []
+        self._slot_columns: list[int] = []
+        # Position of the variable of each value column in declaration order
+        self._column_variables: list[int] = []
+        column_indexes: dict[tuple, int] = {}
+
+        slots = sorted(
+            (
+                (variable, reference)
+                for variable in declared_variables
+                for reference in variable.references
+            ),
+            key=lambda slot: slot[1].start_loc,
+        )
+
+        def get_literal(start: int, end: int | None = None) -> str:
+            literal = json_string[start:end]
+            return literal if is_text else literal.decode("utf-8")
+
+        cursor = 0
+        for variable, reference in slots:
+            self._literals.append(get_literal(cursor, reference.start_loc))
+
+            column_key = (
+                variable.name,
+                tuple((mod.type, tuple(mod.args)) for mod in reference.modifiers),
+            )
+            if column_key not in column_indexes:
+                column_indexes[column_key] = len(self._columns)
+                self._columns.append((variable, reference))
+                self._column_variables.append(variable_positions[variable.name])
+            self._slot_columns.append(column_indexes[column_key])
+
+            cursor = (
+                reference.start_loc + reference.get_total_declaration_char_size()
+            )
+        self._literals.append(get_literal(cursor))
+
+        # Shared static subtrees only exist in structural rendering
+        self._structural = structural or share_static
+        self._share_static = share_static
+        self._codegen = codegen
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Generated functions can't be pickled, they are generated again
+        # on first use
+        state = self.__dict__.copy()
+        state.pop("_generated", None)
+        return state
+
+    @cached_property
+    def _generated(self) -> GeneratedRender | None:
+        """Render functions generated for this template, built on first use
+        if the template was compiled with codegen."""
+        if not self._codegen:
+            return None
+        return generate_render(self)
+
+    @property
+    def render_source(self) -> str | None:
+        """The python source generated for the template render functions,
+        None if the template was not compiled with codegen, or is too large
+        or nested to be compiled."""
+        generated = self._generated
+        return generated.source if generated is not None else None
+
+    @cached_property
+    def _structure(self) -> TemplateStructure | None:
+        """The template parsed into a python object tree, built on first use.
+        None if the template is not valid json around its references."""
+        return build_structure(
+            self._literals, self._slot_columns, share_static=self._share_static
+        )
+
+    @property
+    def _render_structure(self) -> TemplateStructure | None:
+        """The template structure used to render, if the template was
+        compiled as structural, so generated jsons are built directly
+        instead of decoding a json string. Templates that are not valid json
+        around its references fall back to string rendering."""
+        return self._structure if self._structural else None
+
+    def __len__(self) -> int:
+        return self.declared_range_size
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return self.iter_render()
+
+    @overload
+    def __getitem__(self, index: int) -> dict[str, Any]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "TemplateSlice": ...
+
+    def __getitem__(self, index):
+        """Render the generated json at an index, or return a lazy
+        TemplateSlice for a slice. Negative indexes are supported."""
+        indexes = range(self.declared_range_size)
+        if isinstance(index, slice):
+            return TemplateSlice(self, indexes[index])
+        return self.render(indexes[index])
+
+    def _get_column_values(self, index: int) -> list[Any]:
+        """Get the value of each distinct value column at the given index."""
+        if index < 0 or index >= self.declared_range_size:
+            raise IndexError("Index out of range.")
+
+        if self.expansion is ExpansionTypes.PRODUCT:
+            variable_indexes = self._get_variable_indexes(index)
+            return [
+                variable.get_range_value_from_reference(
+                    variable_indexes[position], reference
+                )
+                for (variable, reference), position in zip(
+                    self._columns, self._column_variables
+                )
+            ]
+
+        return [
+            variable.get_range_value_from_reference(index, reference)
+            for variable, reference in self._columns
+        ]
+
+    def _get_variable_indexes(self, index: int) -> list[int]:
+        """Decode a product expansion output index into the range index
+        of each declared variable."""
+        radixes = self._variable_radixes
+        variable_indexes = [0] * len(radixes)
+        for position in range(len(radixes) - 1, -1, -1):
+            index, variable_indexes[position] = divmod(index, radixes[position])
+        return variable_indexes
+
+    def _iter_column_values(self, indexes: range) -> Iterator[Sequence[Any]]:
+        """Get the value of each distinct value column at each of the indexes.
+
+        With zip expansion, each value column is formatted in blocks of
+        COLUMN_BLOCK_SIZE indexes at once, so rendering only looks up the
+        already formatted values.
+        """
+        if self.expansion is ExpansionTypes.PRODUCT or not self._columns:
+            for index in indexes:
+                yield self._get_column_values(index)
+            return
+
+        for offset in range(0, len(indexes), COLUMN_BLOCK_SIZE):
+            block = indexes[offset : offset + COLUMN_BLOCK_SIZE]
+            yield from zip(
+                *(
+                    format_column(
+                        take_values(variable.range, block),
+                        reference.modifiers,
+                        reference.pipeline,
+                    )
+                    for variable, reference in self._columns
+                )
+            )
+
+    @cached_property
+    def _compact_literals(self) -> list[str] | None:
+        """The template literals without json whitespace outside of strings,
+        built on first use."""
+        return compact_literals(self._literals)
+
+    def render_string(self, index: int, compact: bool = False) -> str:
+        """Render the generated json at the given index as JSON string,
+        without decoding it.
+
+        Args:
+            index (int): The range index to render.
+            compact (bool): Remove the template whitespace outside of json
+                strings, so the generated json fits in a single line.
+        Returns:
+            str: The generated JSON string.
+        """
+        if compact and self._compact_literals is None:
+            return json.dumps(
+                self.render(index), ensure_ascii=False, separators=(",", ":")
+            )
+        generated = self._generated
+        if generated is not None:
+            if compact:
+                return generated.render_compact_string(index)
+            return generated.render_string(index)
+        return self._render_string_values(self._get_column_values(index), compact)
+
+    def iter_render_string(
+        self,
+        indexes: Iterable[int] | None = None,
+        compact: bool = False,
+        validate: bool = False,
+    ) -> Iterator[str]:
+        """Lazily render each generated json as JSON string, without
+        decoding them.
+
+        Args:
+            indexes (Iterable[int] | None): The range indexes to render, all
+                of them if None.
+            compact (bool): Remove the template whitespace outside of json
+                strings, so each generated json fits in a single line.
+            validate (bool): Check that each generated json is valid json,
+                decoding it only if its values can't be placed in the
+                template structure.
+        Returns:
+            Iterator[str]: An iterator over the generated JSON strings.
+        Raises:
+            ValueError: With validate, if a generated json is not valid.
+        """
+        if indexes is None:
+            indexes = range(self.declared_range_size)
+
+        if compact and self._compact_literals is None:
+            # Already decoded and encoded again
+            for index in indexes:
+                yield self.render_string(index, compact)
+            return
+
+        if not isinstance(indexes, range) or self._generated is not None:
+            for index in indexes:
+                generated_json_string = self.render_string(index, compact)
+                if validate:
+                    self._validate(
+                        index, self._get_column_values(index), generated_json_string
+                    )
+                yield generated_json_string
+            return
+
+        for index, column_values in zip(indexes, self._iter_column_values(indexes)):
+            generated_json_string = self._render_string_values(column_values, compact)
+            if validate:
+                self._validate(index, column_values, generated_json_string)
+            yield generated_json_string
+
+    def _validate(
+        self, index: int, column_values: Sequence[Any], generated_json_string: str
+    ):
+        """Raise a ValueError if the generated json string is not valid json.
+
+        Values that can be placed in the template structure always render
+        valid json, so only the others are decoded.
+        """
+        structure = self._structure
+        if structure is not None:
+            try:
+                structure.get_values(column_values)
+                return
+            except StructureFallback:
+                pass
+        self._decode(index, generated_json_string)
+
+    def _render_string_values(
+        self, column_values: Sequence[Any], compact: bool = False
+    ) -> str:
+        """Render a generated json as JSON string from its column values."""
+        literals = self._compact_literals if compact else self._literals
+
+        column_texts = [str(value) for value in column_values]
+
+        parts = [literals[0]]
+
+        for slot_index, column in enumerate(self._slot_columns):
+            parts.append(column_texts[column])
+            parts.append(literals[slot_index + 1])
+
+        return "".join(parts)
+
+    def _render(self, index: int, on_render: RenderHook | None) -> dict[str, Any]:
+        """Render the generated json at the given index, calling the
+        already resolved on_render hook if any."""
+        generated = self._generated
+        if generated is None:
+            return self._render_values(
+                index, self._get_column_values(index), on_render
+            )
+
+        if generated.build is not None and on_render is None:
+            try:
+                return generated.build(index)
+            except StructureFallback:
+                pass
+
+        generated_json_string = generated.render_string(index)
+        if on_render is not None:
+            on_render(index, generated_json_string)
+        return self._decode(index, generated_json_string)
+
+    def _render_values(
+        self,
+        index: int,
+        column_values: Sequence[Any],
+        on_render: RenderHook | None,
+    ) -> dict[str, Any]:
+        """Render the generated json at the given index from its column
+        values."""
+        # The hook needs the generated json string, so it always uses
+        # the string rendering
+        structure = self._render_structure
+        if structure is not None and on_render is None:
+            try:
+                return structure.build(column_values)
+            except StructureFallback:
+                pass
+
+        generated_json_string = self._render_string_values(column_values)
+
+        if on_render is not None:
+            on_render(index, generated_json_string)
+
+        return self._decode(index, generated_json_string)
+
+    def _decode(self, index: int, generated_json_string: str) -> dict[str, Any]:
+        """Decode a generated json string as python dict."""
+        try:
+            return json.loads(generated_json_string)
+        except json.JSONDecodeError as exc:
+            logger.debug(
+                "Invalid generated JSON for index %s: %s",
+                index,
+                generated_json_string,
+            )
+            raise ValueError(
+                f"Generated JSON for index {index} is not valid: {exc}"
+            ) from exc
+
+    @cached_property
+    def _stats_counters(self) -> tuple[int, int, list[int]]:
+        """Modifier calls per render, UTF-8 size of the literals and number
+        of slots of each value column, built on first use with stats."""
+        modifiers_per_render = sum(
+            len(reference.modifiers) for _, reference in self._columns
+        )
+        literals_size = sum(len(literal.encode()) for literal in self._literals)
+        column_slots = [0] * len(self._columns)
+        for column in self._slot_columns:
+            column_slots[column] += 1
+        return modifiers_per_render, literals_size, column_slots
+
+    def _render_with_stats(
+        self, index: int, on_render: RenderHook | None, stats: RenderStats
+    ) -> dict[str, Any]:
+        """Same as _render, recording the phase timings and counters."""
+        modifiers_per_render, literals_size, column_slots = self._stats_counters
+
+        start = time.perf_counter()
+        structure = self._render_structure
+        if structure is not None and on_render is None:
+            column_values = self._get_column_values(index)
+            rendered = time.perf_counter()
+            stats.render_time += rendered - start
+            try:
+                document = structure.build(column_values)
+            except StructureFallback:
+                document = None
+            stats.decode_time += time.perf_counter() - rendered
+
+            if document is not None:
+                stats.documents += 1
+                stats.modifiers_applied += modifiers_per_render
+                stats.bytes_produced += literals_size + sum(
+                    len(str(value).encode()) * slots
+                    for value, slots in zip(column_values, column_slots)
+                )
+                return document
+            start = time.perf_counter()
+
+        generated_json_string = self.render_string(index)
+        if on_render is not None:
+            on_render(index, generated_json_string)
+        rendered = time.perf_counter()
+        stats.render_time += rendered - start
+
+        try:
+            document = self._decode(index, generated_json_string)
+        finally:
+            stats.decode_time += time.perf_counter() - rendered
+
+        stats.documents += 1
+        stats.modifiers_applied += modifiers_per_render
+        stats.bytes_produced += len(generated_json_string.encode())
+        return document
+
+    def render(
+        self,
+        index: int,
+        on_render: RenderHook | None = None,
+        stats: RenderStats | None = None,
+    ) -> dict[str, Any]:
+        """Render the generated json at the given index as python dict.
+
+        Args:
+            index (int): The range index to render.
+            on_render (RenderHook | None): Optional callback called with the
+                index and the generated JSON string before it is decoded.
+            stats (RenderStats | None): Optional stats recording the render
+                and decode timings and counters.
+        Returns:
+            dict[str, Any]: The generated JSON object as Python dictionary.
+        """
+        if stats is not None:
+            return self._render_with_stats(
+                index, _get_render_hook(on_render), stats
+            )
+        return self._render(index, _get_render_hook(on_render))
+
+    def iter_render(
+        self,
+        on_render: RenderHook | None = None,
+        workers: int | None = None,
+        stats: RenderStats | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Lazily render each generated json as python dict, one at a time.
+
+        Args:
+            on_render (RenderHook | None): Optional callback called with the
+                index and the generated JSON string before it is decoded.
+            workers (int | None): Number of worker processes to render with,
+                rendering in the current process if None or 1.
+            stats (RenderStats | None): Optional stats recording the render
+                and decode timings and counters.
+        Returns:
+            Iterator[dict[str, Any]]: An iterator over the generated JSON objects.
+        """
+        if workers is not None and workers > 1:
+            if on_render is not None or stats is not None:
+                raise ValueError(
+                    "on_render and stats are not supported with workers."
+                )
+            return iter_render_parallel(self, workers)
+
+        if stats is not None:
+            return self._iter_render_with_stats(
+                _get_render_hook(on_render), stats
+            )
+        return self._iter_render(_get_render_hook(on_render))
+
+    def _iter_render(
+        self, on_render: RenderHook | None, indexes: range | None = None
+    ) -> Iterator[dict[str, Any]]:
+        """Render each generated json at the indexes (all of them if None)
+        in the current process."""
+        if indexes is None:
+            indexes = range(self.declared_range_size)
+
+        # Generated functions compute the column values themselves
+        if self._generated is not None:
+            for index in indexes:
+                yield self._render(index, on_render)
+            return
+
+        for index, column_values in zip(indexes, self._iter_column_values(indexes)):
+            yield self._render_values(index, column_values, on_render)
+
+    def _iter_render_with_stats(
+        self, on_render: RenderHook | None, stats: RenderStats
+    ) -> Iterator[dict[str, Any]]:
+        """Render each generated json in the current process, recording
+        the phase timings and counters."""
+        for i in range(self.declared_range_size):
+            yield self._render_with_stats(i, on_render, stats)
+
+    def render_all(
+        self,
+        on_render: RenderHook | None = None,
+        workers: int | None = None,
+        stats: RenderStats | None = None,
+    ) -> list[dict[str, Any]]:
+        """Render every generated json as python dict.
+
+        Args:
+            on_render (RenderHook | None): Optional callback called with the
+                index and the generated JSON string before it is decoded.
+            workers (int | None): Number of worker processes to render with,
+                rendering in the current process if None or 1.
+            stats (RenderStats | None): Optional stats recording the render
+                and decode timings and counters.
+        Returns:
+            list[dict[str, Any]]: A list of generated JSON objects as Python dictionaries.
+        """
+        return list(self.iter_render(on_render, workers, stats))
+
+    def shard_indexes(
+        self, shard: int, shards: int, strided: bool = False
+    ) -> range:
+        """Get the global range indexes of a shard of the generated jsons.
+
+        Args:
+            shard (int): The shard number, from 0 to shards - 1.
+            shards (int): The total number of shards.
+            strided (bool): Take every shards-th index starting at shard,
+                instead of a contiguous block of indexes.
+        Returns:
+            range: The range indexes of the shard.
+        """
+        if shards < 1 or not 0 <= shard < shards:
+            raise ValueError(
+                f"Invalid shard {shard} of {shards}, expected 0 <= shard < shards."
+            )
+
+        if strided:
+            return range(shard, self.declared_range_size, shards)
+
+        # The first (range size % shards) shards get one extra index
+        block_size, extra = divmod(self.declared_range_size, shards)
+        start = shard * block_size + min(shard, extra)
+        stop = start + block_size + (1 if shard < extra else 0)
+        return range(start, stop)
+
+    def render_shard(
+        self,
+        shard: int,
+        shards: int,
+        strided: bool = False,
+        on_render: RenderHook | None = None,
+    ) -> list[tuple[int, dict[str, Any]]]:
+        """Render only one shard of the generated jsons, skipping the
+        other shards entirely.
+
+        Args:
+            shard (int): The shard number, from 0 to shards - 1.
+            shards (int): The total number of shards.
+            strided (bool): Take every shards-th index starting at shard,
+                instead of a contiguous block of indexes.
+            on_render (RenderHook | None): Optional callback called with the
+                index and the generated JSON string before it is decoded.
+        Returns:
+            list[tuple[int, dict[str, Any]]]: The global range index and the
+                generated JSON object of each json in the shard.
+        """
+        indexes = self.shard_indexes(shard, shards, strided)
+        documents = self._iter_render(_get_render_hook(on_render), indexes)
+        return list(zip(indexes, documents))
+
+    def render_columns(self, indexes: range | None = None) -> ColumnarOutput:
+        """Render the generated jsons as the invariant base json once, plus
+        one column of values per json path where a reference sits, instead
+        of a full copy of the base json per generated json.
+
+        Args:
+            indexes (range | None): The range indexes to render, all of them
+                if None.
+        Returns:
+            ColumnarOutput: The base json and the varying value columns.
+        Raises:
+            ValueError: If the template is not valid json around its
+                references, or its keys contain references.
+        """
+        if indexes is None:
+            indexes = range(self.declared_range_size)
+
+        structure = self._structure
+        if structure is None:
+            raise ValueError(
+                "Template can't be rendered as columns, it is not valid json "
+                "around its references."
+            )
+        try:
+            base, sites = structure.split_varying()
+        except StructureFallback:
+            raise ValueError(
+                "Template can't be rendered as columns, its keys contain references."
+            ) from None
+
+        columns: list[list[Any]] = [[] for _ in sites]
+        for index, column_values in zip(indexes, self._iter_column_values(indexes)):
+            try:
+                values = structure.get_values(column_values)
+            except StructureFallback:
+                document = self._decode(
+                    index, self._render_string_values(column_values)
+                )
+                for column, (path, _) in zip(columns, sites):
+                    column.append(get_path(document, path))
+                continue
+            for column, (_, node) in zip(columns, sites):
+                column.append(node.build(values))
+
+        return ColumnarOutput(
+            base,
+            {path: column for (path, _), column in zip(sites, columns)},
+            indexes,
+        )
+
+
+class TemplateSlice(Sequence):
+    """Lazy view over some of the generated jsons of a CompiledTemplate.
+    Only the accessed indexes are rendered."""
+
+    def __init__(self, template: CompiledTemplate, indexes: range):
+        self.template = template
+        """The template the generated jsons are rendered from."""
+        self.indexes = indexes
+        """The global range indexes of the slice."""
+
+    def __len__(self) -> int:
+        return len(self.indexes)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return self.template._iter_render(  # pylint: disable=protected-access
+            _get_render_hook(None), self.indexes
+        )
+
+    @overload
+    def __getitem__(self, index: int) -> dict[str, Any]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "TemplateSlice": ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return TemplateSlice(self.template, self.indexes[index])
+        return self.template.render(self.indexes[index])
+
+    def __repr__(self) -> str:
+        return f"TemplateSlice({self.indexes})"
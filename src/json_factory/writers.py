@@ -0,0 +1,94 @@
+from typing import TYPE_CHECKING, Iterable, Iterator, TextIO
+
+if TYPE_CHECKING:
+    from .template import CompiledTemplate
+
+WRITE_BUFFER_SIZE = 1 << 20
+"""Number of characters collected before each write to the stream."""
+
+
+def _write_buffered(stream: TextIO, chunks: Iterator[str]):
+    """Write the chunks to the stream in large joined writes."""
+    buffer: list[str] = []
+    buffer_size = 0
+
+    for chunk in chunks:
+        buffer.append(chunk)
+        buffer_size += len(chunk)
+        if buffer_size >= WRITE_BUFFER_SIZE:
+            stream.write("".join(buffer))
+            buffer.clear()
+            buffer_size = 0
+
+    if buffer:
+        stream.write("".join(buffer))
+
+
+def write_ndjson(
+    template: "CompiledTemplate",
+    stream: TextIO,
+    indexes: Iterable[int] | None = None,
+) -> int:
+    """Stream the generated jsons to a text stream as newline delimited
+    json, one compact json per line. Each generated json is validated, but only
+    decoded if its values can't be placed in the template structure.
+
+    Args:
+        template (CompiledTemplate): The parsed template.
+        stream (TextIO): The text stream to write to.
+        indexes (Iterable[int] | None): The range indexes to render, all of
+            them if None.
+    Returns:
+        int: The number of generated jsons written.
+    Raises:
+        ValueError: If a generated json is not valid json.
+    """
+    count = 0
+
+    def lines() -> Iterator[str]:
+        nonlocal count
+        for json_string in template.iter_render_string(
+            indexes, compact=True, validate=True
+        ):
+            yield json_string
+            yield "\n"
+            count += 1
+
+    _write_buffered(stream, lines())
+    return count
+
+
+def write_json_array(
+    template: "CompiledTemplate",
+    stream: TextIO,
+    indexes: Iterable[int] | None = None,
+) -> int:
+    """Stream the generated jsons to a text stream as a single json array,
+    one compact json per line. Each generated json is validated, but only
+    decoded if its values can't be placed in the template structure.
+
+    Args:
+        template (CompiledTemplate): The parsed template.
+        stream (TextIO): The text stream to write to.
+        indexes (Iterable[int] | None): The range indexes to render, all of
+            them if None.
+    Returns:
+        int: The number of generated jsons written.
+    Raises:
+        ValueError: If a generated json is not valid json.
+    """
+    count = 0
+
+    def items() -> Iterator[str]:
+        nonlocal count
+        yield "["
+        for json_string in template.iter_render_string(
+            indexes, compact=True, validate=True
+        ):
+            yield ",\n" if count else "\n"
+            yield json_string
+            count += 1
+        yield "\n]\n" if count else "]\n"
+
+    _write_buffered(stream, items())
+    return count
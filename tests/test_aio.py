@@ -0,0 +1,54 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import json_factory
+
+JSON_STRING = '{"frame" : $frame(<0-249>), "name" : "f_$frame.zfill(3)"}'
+
+
+async def _collect(**kwargs) -> list:
+    documents = json_factory.arender(JSON_STRING, **kwargs)
+    return [document async for document in documents]
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"batch_size": 7},
+        {"offload": True, "batch_size": 64},
+    ],
+)
+def test_arender_matches_from_string(kwargs: dict):
+
+    result = asyncio.run(_collect(**kwargs))
+
+    assert result == json_factory.from_string(JSON_STRING)
+
+
+def test_arender_yields_to_event_loop():
+
+    async def run() -> int:
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        with ThreadPoolExecutor(1) as executor:
+            count = 0
+            template = json_factory.compile(JSON_STRING)
+            async for _ in json_factory.arender(
+                template, batch_size=10, offload=True, executor=executor
+            ):
+                count += 1
+        task.cancel()
+        assert count == 250
+        return ticks
+
+    assert asyncio.run(run()) >= 25
@@ -0,0 +1,79 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import json_factory
+from json_factory import ExpansionTypes, TemplateCache
+
+
+def test_cache_hits_and_misses():
+
+    cache = TemplateCache()
+    compiled = []
+
+    def compile_template():
+        compiled.append(True)
+        return json_factory.compile('{"frame" : $frame(<2>)}', use_cache=False)
+
+    first = cache.get_or_compile("template", None, compile_template)
+    second = cache.get_or_compile("template", None, compile_template)
+    other_options = cache.get_or_compile("template", "product", compile_template)
+
+    assert first is second
+    assert other_options is not first
+    assert len(compiled) == 2
+    assert (cache.hits, cache.misses, len(cache)) == (1, 2, 2)
+
+    cache.clear()
+    assert (cache.hits, cache.misses, len(cache), cache.text_bytes) == (0, 0, 0, 0)
+
+
+def test_cache_evicts_least_recently_used():
+
+    cache = TemplateCache(max_size=2)
+    template = json_factory.compile("{}", use_cache=False)
+
+    cache.get_or_compile("a", None, lambda: template)
+    cache.get_or_compile("b", None, lambda: template)
+    cache.get_or_compile("a", None, lambda: template)
+    cache.get_or_compile("c", None, lambda: template)
+
+    assert len(cache) == 2
+    cache.get_or_compile("a", None, lambda: template)
+    assert cache.hits == 2  # "a" was kept, "b" was evicted
+    cache.get_or_compile("b", None, lambda: template)
+    assert cache.misses == 4
+
+
+def test_cache_text_byte_limit():
+
+    cache = TemplateCache(max_text_bytes=10)
+    template = json_factory.compile("{}", use_cache=False)
+
+    cache.get_or_compile("x" * 11, None, lambda: template)
+    cache.get_or_compile("x" * 6, None, lambda: template)
+    cache.get_or_compile("y" * 6, None, lambda: template)
+
+    assert len(cache) == 1
+    assert cache.text_bytes == 6
+
+
+def test_compile_uses_process_wide_cache():
+
+    json_factory.template_cache.clear()
+    json_string = '{"frame" : $frame(<2>)}'
+
+    def compile_template(_):
+        return json_factory.compile(json_string)
+
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(compile_template, range(8)))
+
+    cache = json_factory.template_cache
+    assert (cache.hits + cache.misses, len(cache)) == (8, 1)
+
+    template = json_factory.compile(json_string)
+    assert json_factory.compile(json_string) is template
+    assert json_factory.compile(json_string, use_cache=False) is not template
+    assert (
+        json_factory.compile(json_string, expansion=ExpansionTypes.PRODUCT)
+        is not template
+    )
@@ -0,0 +1,83 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import json_factory
+from json_factory.cli import main
+
+
+@pytest.fixture
+def template_path(tmp_path: Path) -> Path:
+    """A template file with whitespace inside and outside of strings."""
+    path = tmp_path / "template.json"
+    path.write_text(
+        """{
+  "name" : "job $frame(<0-4>).zfill(3)",
+  "plugin_args" : {
+    "frame_string" : $frame.zfill(5).to_string(),
+    "frame_start" : $frame,
+    "tags" : [ "a b", "c\\"d" ]
+  }
+}""",
+        encoding="utf-8",
+    )
+    return path
+
+
+def test_render_ndjson(template_path: Path, tmp_path: Path):
+
+    output_path = tmp_path / "out.ndjson"
+
+    assert main(["render", str(template_path), "-o", str(output_path)]) == 0
+
+    lines = output_path.read_text(encoding="utf-8").splitlines()
+    expected_result = json_factory.from_string(
+        template_path.read_text(encoding="utf-8")
+    )
+    assert [json.loads(line) for line in lines] == expected_result
+
+
+def test_render_json_array_to_stdout(template_path: Path, capsys):
+
+    assert main(["render", str(template_path), "--format", "json"]) == 0
+
+    expected_result = json_factory.from_string(
+        template_path.read_text(encoding="utf-8")
+    )
+    assert json.loads(capsys.readouterr().out) == expected_result
+
+
+def test_render_invalid_template(tmp_path: Path, capsys):
+
+    template_path = tmp_path / "template.json"
+    template_path.write_text('{"frame" : $frame}', encoding="utf-8")
+
+    assert main(["render", str(template_path)]) == 1
+    assert "json-factory: error:" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("output_format", ["ndjson", "json"])
+def test_render_invalid_generated_json(tmp_path: Path, capsys, output_format: str):
+
+    template_path = tmp_path / "template.json"
+    template_path.write_text('{"a" : $v(<2>).zfill(3), "b" : 1}', encoding="utf-8")
+
+    assert main(["render", str(template_path), "-f", output_format]) == 1
+    assert (
+        "json-factory: error: Generated JSON for index 0 is not valid"
+        in capsys.readouterr().err
+    )
+
+
+def test_render_shard(template_path: Path, capsys):
+
+    assert main(["render", str(template_path), "--shard", "1/2", "--strided"]) == 0
+
+    captured = capsys.readouterr()
+    frames = [
+        json.loads(line)["plugin_args"]["frame_start"]
+        for line in captured.out.splitlines()
+    ]
+    assert frames == [1, 3]
+    assert "range(1, 5, 2)" in captured.err
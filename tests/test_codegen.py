@@ -0,0 +1,103 @@
+import pickle
+
+import pytest
+
+import json_factory
+import json_factory.structure
+from json_factory.entities import VariableModifierTypes
+from json_factory.modifiers import MODIFIER_REGISTRY
+
+TEMPLATES = [
+    """{
+        "name" : "job_$frame(<0-4{2}>).zfill(3).png",
+        "frame" : $frame,
+        "label" : $frame.to_string(),
+        "camera" : "$camera([4,5,6]).to_int()",
+        "nested" : [$frame, {"frame" : "$frame"}, 1e400],
+        "constants" : [1.5, null, true, "it's \\"quoted\\" {text}"]
+    }""",
+    '{"key_$var(<1>)" : 1, "escaped" : "a\\"$var\\n"}',
+    '{"value" : $var(<8-12>).zfill(2)}',
+    "$var([1,5])",
+]
+
+
+@pytest.mark.parametrize("json_string", TEMPLATES)
+@pytest.mark.parametrize("expansion", list(json_factory.ExpansionTypes))
+@pytest.mark.parametrize("structural", [True, False])
+def test_codegen_matches_generic_rendering(json_string, expansion, structural):
+
+    def render(codegen: bool):
+        template = json_factory.compile(
+            json_string,
+            structural=structural,
+            expansion=expansion,
+            codegen=codegen,
+            use_cache=False,
+        )
+        try:
+            indexes = range(len(template))
+            return (
+                template.render_all(),
+                [template.render_string(i) for i in indexes],
+                [template.render_string(i, compact=True) for i in indexes],
+            )
+        except ValueError as exc:
+            return str(exc)
+
+    assert render(codegen=True) == render(codegen=False)
+
+
+def test_render_source():
+
+    template = json_factory.compile('{"frame" : $frame(<1-3>).zfill(3)}', codegen=True)
+
+    assert "str(v0).zfill(3)" in template.render_source
+    assert json_factory.compile('{"frame" : $frame(<1-3>)}').render_source is None
+
+    with pytest.raises(IndexError):
+        template.render(3)
+
+
+def test_codegen_custom_modifier(monkeypatch):
+
+    monkeypatch.setitem(
+        MODIFIER_REGISTRY,
+        VariableModifierTypes.ZFILL,
+        lambda args: lambda value: value * int(args[0]),
+    )
+    template = json_factory.compile(
+        '{"frame" : $frame(<1-3>).zfill(10)}', codegen=True, use_cache=False
+    )
+
+    assert template.render_all() == [{"frame": 10}, {"frame": 20}, {"frame": 30}]
+
+
+def test_codegen_template_pickles():
+
+    template = json_factory.compile('{"frame" : $frame(<1-3>)}', codegen=True)
+    template.render(0)
+
+    unpickled = pickle.loads(pickle.dumps(template))
+
+    assert unpickled.render_all() == template.render_all()
+    assert unpickled.render_source == template.render_source
+
+
+@pytest.mark.parametrize("max_depth", [None, 10_000])
+def test_codegen_deep_nesting(monkeypatch, max_depth):
+
+    if max_depth is not None:
+        # Let the structure itself be too deep to generate source for
+        monkeypatch.setattr(json_factory.structure, "MAX_STRUCTURE_DEPTH", max_depth)
+    depth = 450
+    json_string = "[" * depth + "$v(<2>)" + "]" * depth
+
+    template = json_factory.compile(
+        json_string, structural=True, codegen=True, use_cache=False
+    )
+    document = template.render(1)
+
+    for _ in range(depth):
+        (document,) = document
+    assert document == 1
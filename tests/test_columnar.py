@@ -0,0 +1,67 @@
+import pytest
+
+import json_factory
+from json_factory.entities import VariableModifierTypes
+from json_factory.modifiers import MODIFIER_REGISTRY
+
+
+def test_columns_from_string():
+
+    json_string = """{
+        "name" : "shot_$frame(<1-3>).zfill(3)",
+        "type" : "shot",
+        "frames" : [$frame, $camera([4,5,6]).to_string(), {"fixed" : true}]
+    }"""
+
+    output = json_factory.columns_from_string(json_string)
+
+    assert output.base == {
+        "name": None,
+        "type": "shot",
+        "frames": [None, None, {"fixed": True}],
+    }
+    assert output.columns == {
+        ("name",): ["shot_001", "shot_002", "shot_003"],
+        ("frames", 0): [1, 2, 3],
+        ("frames", 1): ["4", "5", "6"],
+    }
+    assert len(output) == 3
+    assert [output.document(i) for i in range(3)] == json_factory.from_string(
+        json_string
+    )
+
+
+def test_render_columns_indexes():
+
+    template = json_factory.compile('{"a" : $a(<8-12>), "b" : [$a]}')
+
+    output = template.render_columns(range(4, 0, -2))
+
+    assert output.indexes == range(4, 0, -2)
+    assert output.columns == {("a",): [12, 10], ("b", 0): [12, 10]}
+    assert output.document(1) == template.render(2)
+
+
+def test_render_columns_string_fallback(monkeypatch):
+
+    # Escape sequences can't be placed structurally, so the generated json
+    # is decoded from its string
+    monkeypatch.setitem(
+        MODIFIER_REGISTRY,
+        VariableModifierTypes.TO_STRING,
+        lambda args: lambda value: f"{value}\\t",
+    )
+    template = json_factory.compile(
+        '{"a" : "x_$a(<1-2>).to_string()"}', use_cache=False
+    )
+
+    assert template.render_columns().columns == {("a",): ["x_1\t", "x_2\t"]}
+
+
+def test_render_columns_errors():
+
+    with pytest.raises(ValueError):
+        json_factory.columns_from_string('{"key_$a(<1-3>)" : $a}')
+
+    with pytest.raises(ValueError):
+        json_factory.columns_from_string('{"a" : $a(<1-3>) $a}')
@@ -0,0 +1,62 @@
+import pytest
+
+import json_factory
+import json_factory.template
+from json_factory import columns
+from json_factory.entities import VariableModifier, VariableModifierTypes
+from json_factory.modifiers import compile_modifiers
+
+ZFILL_TO_STRING = (
+    VariableModifier("zfill", VariableModifierTypes.ZFILL, 9, args=["4"]),
+    VariableModifier("to_string", VariableModifierTypes.TO_STRING, 12, args=[""]),
+)
+
+
+def test_take_values():
+
+    assert columns.take_values(range(10, 20, 2), range(1, 4)) == range(12, 18, 2)
+    assert columns.take_values(range(10, 20, 2), range(4, -1, -2)) == range(18, 8, -4)
+    assert columns.take_values((4, 5, 6), range(2, -1, -1)) == [6, 5, 4]
+
+    with pytest.raises(IndexError):
+        columns.take_values(range(3), range(2, 5))
+
+
+def test_format_column_without_numpy(monkeypatch):
+
+    monkeypatch.setattr(columns, "numpy", None)
+    pipeline = compile_modifiers(ZFILL_TO_STRING)
+
+    assert columns.format_column(range(-1, 2), ZFILL_TO_STRING, pipeline) == [
+        '"-001"',
+        '"0000"',
+        '"0001"',
+    ]
+    assert columns.format_column(range(3), (), None) == range(3)
+
+
+def test_format_column_with_numpy():
+
+    pytest.importorskip("numpy")
+    pipeline = compile_modifiers(ZFILL_TO_STRING)
+    values = range(-20, 100_000, 7)
+
+    assert columns.format_column(values, ZFILL_TO_STRING, pipeline) == [
+        pipeline(value) for value in values
+    ]
+
+
+def test_batched_rendering_matches_single_renders(monkeypatch):
+
+    monkeypatch.setattr(json_factory.template, "COLUMN_BLOCK_SIZE", 4)
+    template = json_factory.compile(
+        '{"name" : "shot_$frame(<0-20{2}>).zfill(3)", '
+        '"camera" : $camera([1,2,3,4,5,6,7,8,9,10,11]).to_string()}'
+    )
+    singles = [template.render(i) for i in range(len(template))]
+
+    assert template.render_all() == singles
+    assert list(template[::-3]) == singles[::-3]
+    assert list(template.iter_render_string(compact=True)) == [
+        template.render_string(i, compact=True) for i in range(len(template))
+    ]
@@ -0,0 +1,135 @@
+import logging
+
+import pytest
+
+import json_factory
+
+
+def test_compile_renders_same_as_from_string():
+
+    json_string = """{
+        "name" : "job_$frame(<1-3>).zfill(3)",
+        "frame" : $frame,
+        "camera" : $camera([4,5,6]).to_string()
+    }"""
+
+    template = json_factory.compile(json_string)
+
+    assert isinstance(template, json_factory.CompiledTemplate)
+    assert len(template) == 3
+    assert template.render(1) == {"name": "job_002", "frame": 2, "camera": "5"}
+    assert template.render_all() == json_factory.from_string(json_string)
+    # Rendering is repeatable on the same compiled template
+    assert template.render_all() == template.render_all()
+
+
+def test_compile_render_index_out_of_range():
+
+    template = json_factory.compile('{"frame" : $frame(<2>)}')
+
+    with pytest.raises(IndexError):
+        template.render(3)
+
+
+def test_render_string_many_references():
+
+    references = ", ".join(f'"f{i}" : $frame.zfill(4)' for i in range(200))
+    json_string = '{"start" : $frame(<8-10>), ' + references + "}"
+
+    template = json_factory.compile(json_string)
+
+    assert template.render_string(1) == (
+        '{"start" : 9, '
+        + ", ".join(f'"f{i}" : 0009' for i in range(200))
+        + "}"
+    )
+
+
+def test_iter_from_string_is_lazy():
+
+    json_string = '{"frame" : $frame(<0-200000>)}'
+
+    documents = json_factory.iter_from_string(json_string)
+
+    assert next(documents) == {"frame": 0}
+    assert next(documents) == {"frame": 1}
+
+
+def test_iter_from_string_matches_from_string():
+
+    json_string = '{"frame" : $frame([3,1,2]), "name" : "f_$frame.zfill(2)"}'
+
+    assert list(json_factory.iter_from_string(json_string)) == (
+        json_factory.from_string(json_string)
+    )
+
+
+def test_render_does_not_print(capsys):
+
+    json_factory.from_string('{"frame" : $frame(<2>)}')
+
+    assert capsys.readouterr().out == ""
+
+
+def test_on_render_hook_and_debug_logging(caplog):
+
+    json_string = '{"frame" : $frame(<1>)}'
+    rendered: list[tuple[int, str]] = []
+
+    json_factory.from_string(
+        json_string, on_render=lambda i, s: rendered.append((i, s))
+    )
+    assert rendered == [(0, '{"frame" : 0}'), (1, '{"frame" : 1}')]
+
+    with caplog.at_level(logging.DEBUG, logger="json_factory"):
+        json_factory.from_string(json_string)
+    assert "Generated JSON for index 1: {\"frame\" : 1}" in caplog.text
+
+
+def test_references_with_same_modifiers_share_a_column():
+
+    json_string = """{
+        "a" : $frame(<3>),
+        "b" : "$frame.zfill(3)",
+        "c" : "$frame.zfill(3)",
+        "d" : $frame.zfill(3).to_string(),
+        "e" : $frame
+    }"""
+
+    template = json_factory.compile(json_string)
+
+    assert len(template._columns) == 3
+    assert template.render(2) == {"a": 2, "b": "002", "c": "002", "d": "002", "e": 2}
+
+
+@pytest.mark.parametrize("strided", [False, True])
+def test_shards_cover_every_index_once(strided: bool):
+
+    template = json_factory.compile('{"frame" : $frame(<0-9>)}')
+    shards = [template.render_shard(k, 3, strided=strided) for k in range(3)]
+
+    indexes = sorted(i for shard in shards for i, _ in shard)
+    assert indexes == list(range(10))
+    assert all(
+        document == {"frame": i} for shard in shards for i, document in shard
+    )
+    assert template.shard_indexes(0, 3) == range(0, 4)
+    assert template.shard_indexes(2, 3, strided=True) == range(2, 10, 3)
+
+
+def test_random_access_and_slicing():
+
+    template = json_factory.compile('{"frame" : $frame(<0-50000000>)}')
+
+    assert template[7] == {"frame": 7}
+    assert template[-1] == {"frame": 50000000}
+
+    view = template[10:20:3]
+    assert isinstance(view, json_factory.TemplateSlice)
+    assert len(view) == 4
+    assert list(view) == [{"frame": frame} for frame in (10, 13, 16, 19)]
+    assert view[-1] == {"frame": 19}
+    assert list(view[1:3]) == [{"frame": 13}, {"frame": 16}]
+
+    with pytest.raises(IndexError):
+        template[50000001]
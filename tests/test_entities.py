@@ -0,0 +1,48 @@
+import pytest
+
+import json_factory
+from json_factory.entities import Variable, VariableList, VariableReference
+from json_factory.exceptions import (
+    VariableAlreadyInitializedError,
+    VariableNotInitializedError,
+)
+
+
+def test_variable_list_lookup_and_order():
+
+    variables = VariableList()
+    names = [f"$var{i}" for i in range(100)]
+    for name in names:
+        variables.append(Variable(name=name, declaration=VariableReference()))
+
+    assert "$var42" in variables
+    assert "$var100" not in variables
+    assert variables.get_variable("$var42").name == "$var42"
+    assert [variable.name for variable in variables] == names
+    assert len(variables) == 100
+
+
+def test_variable_list_errors():
+
+    variables = VariableList()
+    variables.append(Variable(name="$frame", declaration=VariableReference()))
+
+    with pytest.raises(VariableAlreadyInitializedError):
+        variables.append(Variable(name="$frame", declaration=VariableReference()))
+
+    with pytest.raises(VariableNotInitializedError):
+        variables.get_variable("$camera")
+
+
+def test_references_share_identical_modifier_chains():
+
+    template = json_factory.compile(
+        '{"a" : "$frame(<1-3>).zfill(3)", "b" : "$frame.zfill(3)", "c" : "$frame"}'
+    )
+    (variable,) = template.declared_variables
+    declaration, reference, plain = variable.references
+
+    assert reference.modifiers is declaration.modifiers
+    assert reference.pipeline is declaration.pipeline
+    assert plain.modifiers == ()
+    assert not hasattr(reference, "__dict__")
@@ -0,0 +1,41 @@
+import pytest
+
+import json_factory
+
+
+def test_from_file_renders_same_as_from_string(tmp_path):
+
+    # Multi-byte characters shift the byte offsets of the references
+    json_string = """{
+        "name" : "cámara_$frame(<1-3>).zfill(3)",
+        "label" : "ñ $frame ü",
+        "camera" : $camera([4,5,6]).to_string(),
+        "frame" : $frame,
+        "notes" : "日本"
+    }"""
+    template_path = tmp_path / "template.json"
+    template_path.write_text(json_string, encoding="utf-8")
+
+    template = json_factory.compile_file(template_path)
+
+    assert template.json_string is None
+    assert template.render_all() == json_factory.from_string(json_string)
+    string_template = json_factory.compile(json_string)
+    assert template.render_string(0) == string_template.render_string(0)
+    assert json_factory.from_file(str(template_path)) == json_factory.from_string(
+        json_string
+    )
+
+
+def test_from_file_errors(tmp_path):
+
+    template_path = tmp_path / "template.json"
+    template_path.write_text('{"frame" : $frame(<1-3>, "$other" : $other}')
+
+    with pytest.raises(json_factory.exceptions.VariableNotInitializedError):
+        json_factory.from_file(template_path)
+
+    template_path.write_text("")
+
+    with pytest.raises(ValueError):
+        json_factory.from_file(template_path)
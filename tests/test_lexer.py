@@ -0,0 +1,49 @@
+import pytest
+
+import json_factory
+from json_factory.lexer import TokenTypes, tokenize
+
+
+def test_tokenize():
+
+    json_string = '{"a" : $frame(<0-3>).zfill(3).to_string(), "b" : "$frame.png"}'
+
+    tokens = [
+        (token.type, json_string[token.start : token.end], token.name, token.args)
+        for token in tokenize(json_string)
+    ]
+
+    assert tokens == [
+        (TokenTypes.LITERAL, '{"a" : ', "", ""),
+        (TokenTypes.DECLARATION, "$frame(<0-3>)", "$frame", "<0-3>"),
+        (TokenTypes.MODIFIER, ".zfill(3)", "zfill", "3"),
+        (TokenTypes.MODIFIER, ".to_string()", "to_string", ""),
+        (TokenTypes.LITERAL, ', "b" : "', "", ""),
+        (TokenTypes.REFERENCE, "$frame", "$frame", ""),
+        (TokenTypes.LITERAL, '.png"}', "", ""),
+    ]
+
+
+def test_tokenize_stops_at_unknown_modifier():
+
+    json_string = '"$frame.png.zfill(3)"'
+
+    types = [token.type for token in tokenize(json_string)]
+
+    assert types == [TokenTypes.LITERAL, TokenTypes.REFERENCE, TokenTypes.LITERAL]
+
+
+@pytest.mark.parametrize("encode", [False, True])
+def test_tokenize_case_insensitive_modifiers(encode):
+
+    json_string = '{"a": $v(<2>).ZFILL(3).To_String(), "b": "x$v.Zfill(2)"}'
+
+    tokens = tokenize(json_string.encode() if encode else json_string)
+    modifiers = [token.name for token in tokens if token.type is TokenTypes.MODIFIER]
+
+    assert modifiers == ["zfill", "to_string", "zfill"]
+    assert json_factory.from_string(json_string) == [
+        {"a": "000", "b": "x00"},
+        {"a": "001", "b": "x01"},
+        {"a": "002", "b": "x02"},
+    ]
@@ -1,5 +1,7 @@
 
 import json_factory
+from json_factory.entities import VariableModifier, VariableModifierTypes
+from json_factory.modifiers import MODIFIER_REGISTRY, compile_modifiers
 
 
 def test_to_string_modifier():
@@ -40,4 +42,17 @@ def test_to_string_modifier():
         }
     ]
     
-    assert json_factory.from_string(json_string) == expected_result
\ No newline at end of file
+    assert json_factory.from_string(json_string) == expected_result
+
+def test_compile_modifiers_chain():
+
+    modifiers = [
+        VariableModifier("zfill", VariableModifierTypes.ZFILL, 9, args=["3"]),
+        VariableModifier("to_string", VariableModifierTypes.TO_STRING, 12, args=[""]),
+    ]
+
+    pipeline = compile_modifiers(modifiers)
+
+    assert pipeline(7) == '"007"'
+    assert compile_modifiers([]) is None
+    assert set(MODIFIER_REGISTRY) == set(VariableModifierTypes)
@@ -0,0 +1,34 @@
+import pytest
+
+import json_factory
+from json_factory import ExpansionTypes
+
+
+@pytest.fixture
+def parallel_json_string() -> str:
+    """A JSON string with enough generated jsons to span several chunks."""
+    return """{
+        "name" : "job_$frame(<0-999>).zfill(4)",
+        "frame" : $frame,
+        "camera" : $camera([1,2,3])
+    }"""
+
+
+def test_parallel_rendering_matches_serial(parallel_json_string: str):
+
+    template = json_factory.compile(
+        parallel_json_string, expansion=ExpansionTypes.PRODUCT
+    )
+
+    assert template.render_all(workers=2) == template.render_all()
+
+
+def test_parallel_iter_from_string_is_ordered(parallel_json_string: str):
+
+    documents = json_factory.iter_from_string(
+        parallel_json_string, expansion=ExpansionTypes.PRODUCT, workers=2
+    )
+
+    assert [document["frame"] for document in documents] == [
+        frame for frame in range(1000) for _ in range(3)
+    ]
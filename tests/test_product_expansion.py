@@ -0,0 +1,59 @@
+import itertools
+
+import pytest
+
+import json_factory
+from json_factory import ExpansionTypes
+from json_factory.exceptions import RangeSizeNotDefinedError
+
+
+@pytest.fixture
+def sweep_json_string() -> str:
+    """A JSON string with variables of different range sizes."""
+    return """{
+        "frame" : $frame(<1-3>),
+        "camera" : "$camera([0,1]).zfill(2)",
+        "quality" : $quality([10,50,90])
+    }"""
+
+
+def test_zip_expansion_requires_same_range_size(sweep_json_string: str):
+
+    with pytest.raises(RangeSizeNotDefinedError):
+        json_factory.from_string(sweep_json_string)
+
+
+@pytest.mark.parametrize("expression", ["abc", "<0-9>{3}", "<3-1>"])
+def test_product_expansion_rejects_empty_ranges(expression: str):
+
+    json_string = f'{{"frame" : $frame(<1-3>), "camera" : $camera({expression})}}'
+
+    with pytest.raises(RangeSizeNotDefinedError):
+        json_factory.from_string(json_string, expansion=ExpansionTypes.PRODUCT)
+
+
+def test_product_expansion(sweep_json_string: str):
+
+    result = json_factory.from_string(
+        sweep_json_string, expansion=ExpansionTypes.PRODUCT
+    )
+
+    expected_result = [
+        {"frame": frame, "camera": f"{camera:02}", "quality": quality}
+        for frame, camera, quality in itertools.product(
+            [1, 2, 3], [0, 1], [10, 50, 90]
+        )
+    ]
+
+    assert result == expected_result
+
+
+def test_product_expansion_random_access():
+
+    template = json_factory.compile(
+        '{"a" : $a(<0-999>), "b" : $b(<0-999>), "c" : $c(<0-999>)}',
+        expansion=ExpansionTypes.PRODUCT,
+    )
+
+    assert len(template) == 1000**3
+    assert template.render(123456789) == {"a": 123, "b": 456, "c": 789}
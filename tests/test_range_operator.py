@@ -260,3 +260,13 @@ def test_step_custom_range_operator_processing(
     assert (
         result == expected_step_custom_range_operator_json_result
     ), f"Expected {expected_step_custom_range_operator_json_result}, but got {result}"
+
+
+def test_range_operator_is_not_materialized():
+    """Range operator values are kept as lazy range objects."""
+    template = json_factory.compile('{"frame" : $frame(<0-50000000{2}>)}')
+    variable = template.declared_variables.get_variable("$frame")
+
+    assert variable.range == range(0, 50000001, 2)
+    assert len(template) == 25000001
+    assert template.render(len(template) - 1) == {"frame": 50000000}
@@ -0,0 +1,46 @@
+import pytest
+
+import json_factory
+from json_factory import RenderStats
+
+JSON_STRING = """{
+    "name" : "job_$frame(<0-9>).zfill(4)",
+    "frame" : $frame,
+    "label" : $frame.zfill(2).to_string(),
+    "camera" : $camera([1,2,3,4,5,6,7,8,9,10])
+}"""
+
+
+@pytest.mark.parametrize("structural", [True, False])
+def test_render_stats(structural: bool):
+
+    template = json_factory.compile(JSON_STRING, structural=structural)
+    stats = RenderStats()
+
+    result = template.render_all(stats=stats)
+
+    assert result == json_factory.from_string(JSON_STRING)
+    assert stats.documents == 10
+    # zfill + (zfill, to_string) per document
+    assert stats.modifiers_applied == 30
+    assert stats.bytes_produced == sum(
+        len(template.render_string(i).encode()) for i in range(10)
+    )
+    assert stats.render_time > 0 and stats.decode_time > 0
+
+
+def test_from_string_stats():
+
+    json_factory.template_cache.clear()
+    stats = RenderStats()
+
+    json_factory.from_string(JSON_STRING, stats=stats)
+    json_factory.from_string(JSON_STRING, stats=stats)
+
+    exported = stats.as_dict()
+    assert exported["templates"] == 2
+    assert exported["cache_hits"] == 1
+    assert exported["variables"] == 4
+    assert exported["references"] == 8
+    assert exported["documents"] == 20
+    assert exported["scan_time"] > 0 and exported["parse_time"] > 0
@@ -0,0 +1,87 @@
+import pytest
+
+import json_factory
+
+TEMPLATES = [
+    """{
+        "name" : "job_$frame(<0-2>).zfill(3).png",
+        "frame" : $frame,
+        "label" : $frame.to_string(),
+        "nested" : [$frame, {"frame" : "$frame"}],
+        "constants" : [1.5, null, true, "text"]
+    }""",
+    '{"key_$var(<1>)" : 1, "escaped" : "a\\"$var\\n"}',
+    '{"value" : $var([1,5]).zfill(2).to_int()}',
+]
+
+
+@pytest.mark.parametrize("json_string", TEMPLATES)
+def test_structural_matches_string_rendering(json_string: str):
+    """Structural rendering must generate the same jsons as decoding the
+    rendered JSON strings."""
+
+    structural = json_factory.compile(json_string, structural=True)
+    string_rendering = json_factory.compile(json_string)
+
+    assert structural._render_structure is not None
+    assert string_rendering._render_structure is None
+    assert structural.render_all() == string_rendering.render_all()
+
+
+def test_structural_rejects_escaped_markers():
+
+    json_string = r'{"a" : $v(<2>), "b" : "\ue0000\ue001", "\ue002" : 1}'
+
+    template = json_factory.compile(json_string, structural=True)
+
+    assert template._structure is None
+    assert template.render(1) == {"a": 1, "b": "\ue0000\ue001", "\ue002": 1}
+
+
+def test_structural_outputs_do_not_share_objects():
+
+    template = json_factory.compile(
+        '{"args" : {"frame" : $frame(<1>)}, "tags" : []}', structural=True
+    )
+    first, second = template.render_all()
+
+    assert first["args"] is not second["args"]
+    assert first["tags"] is not second["tags"]
+
+
+def test_share_static_subtrees():
+
+    json_string = """{
+        "frame" : $frame(<1>),
+        "env" : {"paths" : ["/a", "/b"], "debug" : false},
+        "args" : {"frame" : $frame, "tags" : []}
+    }"""
+    template = json_factory.compile(json_string, share_static=True)
+    first, second = template.render_all()
+
+    assert first == json_factory.from_string(json_string)[0]
+    assert first["env"] is second["env"]
+    assert first["args"]["tags"] is second["args"]["tags"]
+    # Objects with references are still built for each generated json
+    assert first["args"] is not second["args"]
+    assert json_factory.compile(json_string) is not template
+
+
+def test_structural_falls_back_to_invalid_json_error():
+
+    template = json_factory.compile('{"frame" : $frame(<2>).zfill(3)}', structural=True)
+
+    with pytest.raises(ValueError, match="Generated JSON for index 0 is not valid"):
+        template.render(0)
+
+
+@pytest.mark.parametrize("depth", [50, 600, 900])
+def test_structural_deep_nesting(depth: int):
+
+    json_string = "[" * depth + "$v(<2>)" + "]" * depth
+    template = json_factory.compile(json_string, structural=True)
+    document = template.render(1)
+
+    for _ in range(depth):
+        (document,) = document
+    assert document == 1